@@ -1,19 +1,34 @@
-import base64
+import atexit
+import binascii
+import hashlib
+import hmac
 import html as html_lib
 import json
 import logging
 import os
+import queue
 import re
 import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from functools import wraps
-from logging.handlers import RotatingFileHandler
+from functools import lru_cache, wraps
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from types import SimpleNamespace
 
-from flask import Flask, flash, jsonify, redirect, render_template, request, url_for
+from flask import (
+    Flask,
+    Response,
+    flash,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -22,9 +37,21 @@ from flask_login import (
     login_user,
     logout_user,
 )
-from sqlalchemy import text
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import event, func, or_, select, text
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import check_password_hash, generate_password_hash
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from argon2 import PasswordHasher
+except ImportError:
+    PasswordHasher = None
+
 from config import (
     ADMIN_PASSWORD,
     ADMIN_PASSWORD_HASH,
@@ -39,7 +66,14 @@ from config import (
     STATUS_DATABASE_URL,
     TEMPLATES_DATABASE_URL,
 )
-from models import BiliBinding, BiliLogEntry, BiliUser, OneBotProfile, db
+from models import (
+    BiliBinding,
+    BiliLogEntry,
+    BiliScreenshotTemplate,
+    BiliUser,
+    OneBotProfile,
+    db,
+)
 from services.bili_api import (
     download_image,
     fetch_dynamic_list,
@@ -59,7 +93,9 @@ from services.monitor import BiliMonitor
 from services.onebot_manager import OneBotManager
 from services.screenshot_store import (
     delete_screenshot_templates,
+    delete_screenshot_templates_bulk,
     ensure_screenshot_templates,
+    get_screenshot_template_pair,
     get_screenshot_template_value,
     save_screenshot_templates,
 )
@@ -71,10 +107,40 @@ from services.settings import (
     set_global_poll_interval,
     set_live_hourly_interval_minutes,
 )
-from services.state import delete_status, get_status, init_state
+from services.state import delete_status, get_statuses, init_state
 from services.time_utils import format_duration
 
-_SPECIAL_PATTERN = re.compile(r"(\{SHOTPICTURE\}|\[atALL\])")
+_UID_RE = re.compile(r"uid=([0-9]+)")
+_SPECIAL_TOKENS = ("{SHOTPICTURE}", "[atALL]")
+
+
+@lru_cache(maxsize=256)
+def _split_special(template: str) -> tuple[str, ...]:
+    # Fixed-literal scan; a substring gate plus str.find beats the regex
+    # alternation on every rendered message. 模板集合有限，切分结果缓存复用。
+    if "{SHOTPICTURE}" not in template and "[atALL]" not in template:
+        return (template,)
+    parts = []
+    rest = template
+    while rest:
+        idx = -1
+        token = ""
+        for candidate in _SPECIAL_TOKENS:
+            pos = rest.find(candidate)
+            if pos != -1 and (idx == -1 or pos < idx):
+                idx = pos
+                token = candidate
+        if idx == -1:
+            parts.append(rest)
+            break
+        if idx:
+            parts.append(rest[:idx])
+        parts.append(token)
+        rest = rest[idx + len(token):]
+    return tuple(parts)
+
+# Built once so SQLAlchemy can reuse its compiled-statement cache per flush.
+_LOG_INSERT_STMT = BiliLogEntry.__table__.insert()
 
 @dataclass
 class AdminUser(UserMixin):
@@ -104,17 +170,78 @@ class UpUser(UserMixin):
 
 
 ADMIN_USER = AdminUser(username=ADMIN_USERNAME)
+_ADMIN_USERNAME_B = ADMIN_USERNAME.encode("utf-8")
+
+# argon2id 比 werkzeug 默认的 pbkdf2-sha256 每次校验便宜得多；未安装时回退。
+if PasswordHasher is not None:
+    _ARGON2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+else:
+    _ARGON2 = None
+
+
+def _hash_password(password: str) -> str:
+    if _ARGON2 is not None:
+        return _ARGON2.hash(password)
+    return generate_password_hash(password)
+
+
+def _check_password(password_hash: str, password: str) -> bool:
+    if password_hash.startswith("$argon2"):
+        if _ARGON2 is None:
+            return False
+        try:
+            return _ARGON2.verify(password_hash, password)
+        except Exception:
+            return False
+    return check_password_hash(password_hash, password)
+
 
 if ADMIN_PASSWORD_HASH:
     _ADMIN_HASH = ADMIN_PASSWORD_HASH
 else:
-    _ADMIN_HASH = generate_password_hash(ADMIN_PASSWORD)
+    _ADMIN_HASH = _hash_password(ADMIN_PASSWORD)
+
+# Successful logins are remembered as HMAC(SECRET_KEY, password) tokens so
+# repeated correct logins skip the expensive KDF. Only positives are cached.
+_VERIFY_CACHE_MAX = 128
+_password_verify_cache: set[str] = set()
+
+
+def _password_cache_token(scope: str, password: str) -> str:
+    mac = hmac.new(SECRET_KEY.encode("utf-8"), password.encode("utf-8"), hashlib.sha256)
+    return f"{scope}:{mac.hexdigest()}"
+
+
+def _verify_password_cached(scope: str, password_hash: str, password: str) -> bool:
+    token = _password_cache_token(scope, password)
+    if token in _password_verify_cache:
+        return True
+    if not _check_password(password_hash, password):
+        return False
+    if len(_password_verify_cache) >= _VERIFY_CACHE_MAX:
+        _password_verify_cache.clear()
+    _password_verify_cache.add(token)
+    return True
+
+
+def _invalidate_password_cache(scope: str):
+    prefix = f"{scope}:"
+    for token in list(_password_verify_cache):
+        if token.startswith(prefix):
+            _password_verify_cache.discard(token)
 
 class _UidExtractFilter(logging.Filter):
     def filter(self, record):
         if not hasattr(record, "uid") or record.uid in (None, ""):
-            msg = record.getMessage()
-            match = re.search(r"uid=([0-9]+)", msg)
+            # Cheap substring gate on the raw msg before formatting/regex;
+            # most records carry no uid at all.
+            msg = record.msg if isinstance(record.msg, str) else record.getMessage()
+            if "uid=" not in msg:
+                record.uid = ""
+                return True
+            if record.args:
+                msg = record.getMessage()
+            match = _UID_RE.search(msg)
             if match:
                 record.uid = match.group(1)
             else:
@@ -122,58 +249,145 @@ class _UidExtractFilter(logging.Filter):
         return True
 
 
+# [whole second, formatted prefix]；同一秒内的突发日志只拼接微秒部分。
+_TS_CACHE = [-1, ""]
+
+
+def _fast_iso(created: float) -> str:
+    sec = int(created)
+    if _TS_CACHE[0] != sec:
+        tm = time.gmtime(sec)
+        _TS_CACHE[:] = [
+            sec,
+            f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}",
+        ]
+    return f"{_TS_CACHE[1]}.{int((created - sec) * 1e6):06d}Z"
+
+
+def _build_log_payload(record) -> dict:
+    return {
+        "time": _fast_iso(record.created),
+        "level": record.levelname,
+        "logger": record.name,
+        "message": record.getMessage(),
+        "uid": getattr(record, "uid", ""),
+        "module": record.module,
+        "line": record.lineno,
+        "thread": record.threadName,
+    }
+
+
+def _loads_log_payload(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps_log_payload(payload: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False)
+
+
 class _JsonLogFormatter(logging.Formatter):
     def format(self, record):
-        payload = {
-            "time": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
-            "level": record.levelname,
-            "logger": record.name,
-            "message": record.getMessage(),
-            "uid": getattr(record, "uid", ""),
-            "module": record.module,
-            "line": record.lineno,
-            "thread": record.threadName,
-        }
-        return json.dumps(payload, ensure_ascii=False)
+        return _dumps_log_payload(_build_log_payload(record))
 
 
 class _DbLogHandler(logging.Handler):
+    _FLUSH_INTERVAL = 1.0
+    _MAX_BATCH = 500
+
     def __init__(self, engine):
         super().__init__()
         self.engine = engine
         self.setLevel(logging.DEBUG)
         self.addFilter(_UidExtractFilter())
+        self._buffer = deque(maxlen=10000)
+        self._wakeup = threading.Event()
+        self._worker = threading.Thread(
+            target=self._drain_loop, daemon=True, name="db-log-flush"
+        )
+        self._worker.start()
+        atexit.register(self._flush)
 
     def emit(self, record):
         try:
-            payload = {
-                "time": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
-                "level": record.levelname,
-                "logger": record.name,
-                "message": record.getMessage(),
-                "uid": getattr(record, "uid", ""),
-                "module": record.module,
-                "line": record.lineno,
-                "thread": record.threadName,
-            }
-            data = json.dumps(payload, ensure_ascii=False)
-            with self.engine.begin() as conn:
-                conn.execute(
-                    BiliLogEntry.__table__.insert().values(
-                        time=payload["time"],
-                        level=payload["level"],
-                        logger=payload["logger"],
-                        message=payload["message"],
-                        uid=payload["uid"],
-                        module=payload["module"],
-                        line=payload["line"],
-                        thread=payload["thread"],
-                        payload=data,
-                    )
-                )
+            self._buffer.append(_build_log_payload(record))
+            self._wakeup.set()
         except Exception:
             return
 
+    def _drain_loop(self):
+        while True:
+            self._wakeup.wait(self._FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self._flush()
+
+    def _flush(self):
+        while True:
+            rows = []
+            while self._buffer and len(rows) < self._MAX_BATCH:
+                try:
+                    payload = self._buffer.popleft()
+                except IndexError:
+                    break
+                row = dict(payload)
+                row["payload"] = _dumps_log_payload(payload)
+                rows.append(row)
+            if not rows:
+                return
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(_LOG_INSERT_STMT, rows)
+            except Exception:
+                # Retry rows individually so one bad record doesn't drop the batch.
+                for row in rows:
+                    try:
+                        with self.engine.begin() as conn:
+                            conn.execute(_LOG_INSERT_STMT, row)
+                    except Exception:
+                        continue
+
+
+# Slow handlers (file rotation, DB writes) run on a QueueListener thread so
+# request/poll threads only enqueue records.
+_LOG_QUEUE: queue.SimpleQueue | None = None
+_LOG_LISTENER: QueueListener | None = None
+
+
+# 手动“检查更新”复用同一个工作线程，避免重复点击时堆出一堆轮询线程。
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="refresh")
+_REFRESH_INFLIGHT = threading.Event()
+
+
+def _run_forced_poll(monitor):
+    try:
+        monitor._poll_once(force=True)
+    finally:
+        _REFRESH_INFLIGHT.clear()
+
+
+def _attach_async_handler(handler: logging.Handler):
+    global _LOG_QUEUE, _LOG_LISTENER
+    if _LOG_LISTENER is None:
+        _LOG_QUEUE = queue.SimpleQueue()
+        _LOG_LISTENER = QueueListener(_LOG_QUEUE, handler, respect_handler_level=True)
+        _LOG_LISTENER.start()
+        atexit.register(_LOG_LISTENER.stop)
+        queue_handler = QueueHandler(_LOG_QUEUE)
+        queue_handler.setLevel(logging.DEBUG)
+        logging.getLogger().addHandler(queue_handler)
+    else:
+        _LOG_LISTENER.handlers = _LOG_LISTENER.handlers + (handler,)
+
+
+def _has_async_handler(handler_type) -> bool:
+    if _LOG_LISTENER is None:
+        return False
+    return any(isinstance(handler, handler_type) for handler in _LOG_LISTENER.handlers)
+
 
 def _setup_file_logging():
     if not LOG_FILE:
@@ -182,12 +396,8 @@ def _setup_file_logging():
     if log_dir:
         os.makedirs(log_dir, exist_ok=True)
 
-    root = logging.getLogger()
-    for handler in root.handlers:
-        if isinstance(handler, RotatingFileHandler) and getattr(
-            handler, "baseFilename", None
-        ) == os.path.abspath(LOG_FILE):
-            return
+    if _has_async_handler(RotatingFileHandler):
+        return
 
     file_handler = RotatingFileHandler(
         LOG_FILE,
@@ -198,10 +408,13 @@ def _setup_file_logging():
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(_JsonLogFormatter())
     file_handler.addFilter(_UidExtractFilter())
-    root.addHandler(file_handler)
+    _attach_async_handler(file_handler)
 
+    root = logging.getLogger()
     for handler in root.handlers:
-        if isinstance(handler, logging.StreamHandler):
+        if isinstance(handler, logging.StreamHandler) and not isinstance(
+            handler, QueueHandler
+        ):
             handler.setLevel(logging.INFO)
     root.setLevel(logging.DEBUG)
 
@@ -213,21 +426,33 @@ def _setup_file_logging():
 def _setup_db_logging(app: Flask):
     if not LOGS_DATABASE_URL:
         return
-    root = logging.getLogger()
-    for handler in root.handlers:
-        if isinstance(handler, _DbLogHandler):
-            return
+    if _has_async_handler(_DbLogHandler):
+        return
     try:
         engine = db.get_engine(app, bind="logs")
     except Exception:
         return
     db_handler = _DbLogHandler(engine)
-    root.addHandler(db_handler)
+    _attach_async_handler(db_handler)
 
 
 login_manager = LoginManager()
 login_manager.login_view = "login"
 
+# load_user runs on every authenticated request; cache the resolved UpUser
+# per request (flask.g) plus a short in-process TTL to skip the SELECT.
+_USER_CACHE_TTL = 30.0
+_user_cache: dict[int, tuple[float, UpUser]] = {}
+
+
+def _invalidate_user_cache(user_id):
+    if user_id is None:
+        return
+    try:
+        _user_cache.pop(int(user_id), None)
+    except (TypeError, ValueError):
+        return
+
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -238,15 +463,27 @@ def load_user(user_id):
             uid = int(user_id.split(":", 1)[1])
         except ValueError:
             return None
-        user = BiliUser.query.get(uid)
+        cached = getattr(g, "_up_user", None)
+        if cached is not None and cached.user_id == uid:
+            return cached
+        now = time.time()
+        entry = _user_cache.get(uid)
+        if entry and now - entry[0] < _USER_CACHE_TTL:
+            g._up_user = entry[1]
+            return entry[1]
+        user = db.session.get(BiliUser, uid)
         if not user or not user.enabled:
+            _user_cache.pop(uid, None)
             return None
-        return UpUser(
+        up_user = UpUser(
             user_id=user.id,
             uid=user.uid,
             name=user.name,
             login_username=user.login_username or user.uid,
         )
+        _user_cache[uid] = (now, up_user)
+        g._up_user = up_user
+        return up_user
     return None
 
 
@@ -275,6 +512,16 @@ def user_required(fn):
     return wrapper
 
 
+# status/logs 库都是高频小事务，SQLite 默认 journal 模式每次提交都 fsync；
+# WAL + synchronous=NORMAL 把提交开销降一个量级，崩溃也只回退到最近的 checkpoint。
+def _set_sqlite_pragmas(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 def create_app():
     logging.basicConfig(
         level=logging.INFO,
@@ -282,12 +529,46 @@ def create_app():
     )
     _setup_file_logging()
     app = Flask(__name__)
+    # Compile Jinja templates once to disk instead of per worker start.
+    jinja_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jinja_cache")
+    try:
+        os.makedirs(jinja_cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+    except OSError:
+        pass
+    app.jinja_env.auto_reload = app.debug
+    app.config["TEMPLATES_AUTO_RELOAD"] = app.debug
     app.config["SECRET_KEY"] = SECRET_KEY
     app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        # LIFO 让空闲连接尽快老化回收，热连接保持缓存友好。
+        "pool_use_lifo": True,
+    }
+    # logs 库由 _DbLogHandler 高频写入，给更大的连接池；其余辅助库保持小池。
     app.config["SQLALCHEMY_BINDS"] = {
-        "logs": LOGS_DATABASE_URL,
-        "status": STATUS_DATABASE_URL,
-        "templates": TEMPLATES_DATABASE_URL,
+        "logs": {
+            "url": LOGS_DATABASE_URL,
+            "pool_size": 20,
+            "max_overflow": 40,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        },
+        "status": {
+            "url": STATUS_DATABASE_URL,
+            "pool_size": 5,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        },
+        "templates": {
+            "url": TEMPLATES_DATABASE_URL,
+            "pool_size": 5,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        },
     }
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
@@ -296,15 +577,22 @@ def create_app():
     init_state(app)
 
     with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _set_sqlite_pragmas)
         db.create_all()
         for bind_key in ("logs", "status", "templates"):
             try:
                 db.create_all(bind=bind_key)
             except Exception:
                 continue
-        _ensure_user_columns()
-        _ensure_onebot_profile_columns()
-        _ensure_binding_columns()
+        # 迁移只在库落后于代码时跑；热重启直接跳过全部列检查和回填。
+        if _get_schema_revision() < _SCHEMA_REVISION:
+            _ensure_user_columns()
+            _ensure_onebot_profile_columns()
+            _ensure_binding_columns()
+            _ensure_log_indexes(app)
+            _set_schema_revision(_SCHEMA_REVISION)
         _seed_bindings()
         _ensure_screenshot_template_records()
         ensure_global_poll_interval()
@@ -331,7 +619,12 @@ def create_app():
         onebot.start()
         monitor.start()
 
-    if not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+    # In multi-worker deployments only one process should poll Bilibili and
+    # push to OneBot; set BILI_ROLE=web on the other workers to opt out.
+    role = os.environ.get("BILI_ROLE", "worker").strip().lower()
+    if role == "worker" and (
+        not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    ):
         _start_background()
 
     @app.route("/")
@@ -344,13 +637,26 @@ def create_app():
             username = request.form.get("username", "").strip()
             password = request.form.get("password", "")
 
-            if username == ADMIN_USERNAME and check_password_hash(_ADMIN_HASH, password):
+            if hmac.compare_digest(
+                username.encode("utf-8"), _ADMIN_USERNAME_B
+            ) and _verify_password_cached("admin", _ADMIN_HASH, password):
                 login_user(ADMIN_USER)
                 return redirect(url_for("admin"))
 
             user = _find_user_by_login(username)
             if user and user.enabled and user.password_hash:
-                if check_password_hash(user.password_hash, password):
+                if _verify_password_cached(
+                    f"user:{user.id}", user.password_hash, password
+                ):
+                    # 旧的 pbkdf2 哈希在登录成功时顺手升级到 argon2。
+                    if _ARGON2 is not None and not user.password_hash.startswith(
+                        "$argon2"
+                    ):
+                        try:
+                            user.password_hash = _ARGON2.hash(password)
+                            db.session.commit()
+                        except Exception:
+                            db.session.rollback()
                     login_user(
                         UpUser(
                             user_id=user.id,
@@ -379,7 +685,11 @@ def create_app():
     def refresh_now():
         monitor = app.extensions.get("bili_monitor")
         if monitor:
-            threading.Thread(target=monitor._poll_once, kwargs={"force": True}, daemon=True).start()
+            if _REFRESH_INFLIGHT.is_set():
+                flash("已有一次检查在进行", "info")
+                return redirect(request.referrer or url_for("index"))
+            _REFRESH_INFLIGHT.set()
+            _REFRESH_POOL.submit(_run_forced_poll, monitor)
         flash("已触发检查更新", "success")
         return redirect(request.referrer or url_for("index"))
 
@@ -430,20 +740,15 @@ def create_app():
     @app.route("/admin/add", methods=["POST"])
     @admin_required
     def admin_add():
-        uid = request.form.get("uid", "").strip()
-        name = request.form.get("name", "").strip()
-        login_username = request.form.get("login_username", "").strip()
-        password = request.form.get("password", "").strip()
-        poll_interval_raw = request.form.get("poll_interval", "").strip()
+        uid, name, login_username, password, poll_interval_raw = (
+            request.form.get(key, "").strip()
+            for key in ("uid", "name", "login_username", "password", "poll_interval")
+        )
 
         if not uid:
             flash("UID 不能为空", "error")
             return redirect(url_for("admin"))
 
-        if BiliUser.query.filter_by(uid=uid).first():
-            flash("该 UID 已存在", "error")
-            return redirect(url_for("admin"))
-
         if not name:
             info = fetch_user_info(uid)
             if info:
@@ -451,13 +756,8 @@ def create_app():
 
         if not login_username:
             login_username = uid
-        else:
-            existing_login = BiliUser.query.filter_by(login_username=login_username).first()
-            if existing_login:
-                flash("登录名已被占用", "error")
-                return redirect(url_for("admin"))
 
-        password_hash = generate_password_hash(password) if password else ""
+        password_hash = _hash_password(password) if password else ""
 
         poll_interval = 0
         if poll_interval_raw:
@@ -477,7 +777,14 @@ def create_app():
             poll_interval=poll_interval,
         )
         db.session.add(user)
-        db.session.commit()
+        # Uniqueness is enforced by the DB; one write instead of
+        # SELECT-then-INSERT, and no race between the check and the insert.
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            flash("该 UID 或登录名已存在", "error")
+            return redirect(url_for("admin"))
 
         flash("UP 主已添加", "success")
         return redirect(url_for("admin"))
@@ -485,14 +792,18 @@ def create_app():
     @app.route("/admin/delete/<int:user_id>", methods=["POST"])
     @admin_required
     def admin_delete(user_id):
-        user = BiliUser.query.get_or_404(user_id)
+        user = (
+            BiliUser.query.options(db.selectinload(BiliUser.bindings))
+            .filter_by(id=user_id)
+            .first_or_404()
+        )
         uid = user.uid
         binding_ids = [binding.id for binding in user.bindings]
-        for binding_id in binding_ids:
-            delete_screenshot_templates(binding_id)
+        delete_screenshot_templates_bulk(binding_ids)
         delete_status(user.id)
         db.session.delete(user)
         db.session.commit()
+        _invalidate_user_cache(user_id)
         _reset_monitor_state(uid)
         flash("UP 主已删除", "success")
         return redirect(url_for("admin"))
@@ -502,20 +813,40 @@ def create_app():
     def admin_edit(user_id):
         user = BiliUser.query.get_or_404(user_id)
         if request.method == "POST":
-            action = request.form.get("action", "save").strip()
-            uid = request.form.get("uid", "").strip()
-            name = request.form.get("name", "").strip()
+            (
+                action,
+                uid,
+                name,
+                login_username,
+                password,
+                poll_interval_raw,
+                cookie_input,
+                sessdata,
+                bili_jct,
+                buvid3,
+                buvid4,
+                dedeuserid,
+                ac_time_value,
+            ) = (
+                request.form.get(key, "").strip()
+                for key in (
+                    "action",
+                    "uid",
+                    "name",
+                    "login_username",
+                    "password",
+                    "poll_interval",
+                    "cookie",
+                    "sessdata",
+                    "bili_jct",
+                    "buvid3",
+                    "buvid4",
+                    "dedeuserid",
+                    "ac_time_value",
+                )
+            )
+            action = action or "save"
             enabled = bool(request.form.get("enabled"))
-            login_username = request.form.get("login_username", "").strip()
-            password = request.form.get("password", "").strip()
-            poll_interval_raw = request.form.get("poll_interval", "").strip()
-            cookie_input = request.form.get("cookie", "").strip()
-            sessdata = request.form.get("sessdata", "").strip()
-            bili_jct = request.form.get("bili_jct", "").strip()
-            buvid3 = request.form.get("buvid3", "").strip()
-            buvid4 = request.form.get("buvid4", "").strip()
-            dedeuserid = request.form.get("dedeuserid", "").strip()
-            ac_time_value = request.form.get("ac_time_value", "").strip()
 
             if not uid:
                 flash("UID 不能为空", "error")
@@ -555,27 +886,19 @@ def create_app():
                     poll_interval_default=get_global_poll_interval(),
                 )
 
-            exists = BiliUser.query.filter(BiliUser.uid == uid, BiliUser.id != user_id).first()
-            if exists:
-                flash("该 UID 已存在", "error")
-                return redirect(url_for("admin_edit", user_id=user_id))
-
-            if login_username:
-                dup_login = BiliUser.query.filter(
-                    BiliUser.login_username == login_username, BiliUser.id != user_id
-                ).first()
-                if dup_login:
-                    flash("该登录名已被占用", "error")
-                    return redirect(url_for("admin_edit", user_id=user_id))
-            else:
+            if not login_username:
                 login_username = uid
 
             user.uid = uid
             user.name = name or f"UID {uid}"
             user.enabled = enabled
             user.login_username = login_username
-            if password:
-                user.password_hash = generate_password_hash(password)
+            if password and not (
+                user.password_hash and _check_password(user.password_hash, password)
+            ):
+                # Skip re-hashing when the submitted password already matches.
+                user.password_hash = _hash_password(password)
+                _invalidate_password_cache(f"user:{user.id}")
 
             poll_interval = 0
             if poll_interval_raw:
@@ -605,10 +928,17 @@ def create_app():
             user.buvid4 = payload.get("buvid4", "")
             user.dedeuserid = payload.get("dedeuserid", "")
             user.ac_time_value = payload.get("ac_time_value", "")
+            _invalidate_credential_payload_cache(user.id)
 
             if action == "clear_credential":
                 _clear_user_credential(user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                flash("该 UID 或登录名已被占用", "error")
+                return redirect(url_for("admin_edit", user_id=user_id))
+            _invalidate_user_cache(user_id)
 
             if action == "clear_credential":
                 flash("UP 主凭据已清空", "success")
@@ -699,7 +1029,6 @@ def create_app():
     @admin_required
     def admin_binding_new(user_id):
         user = BiliUser.query.get_or_404(user_id)
-        profiles = OneBotProfile.query.order_by(OneBotProfile.id.desc()).all()
         if request.method == "POST":
             binding = _build_binding_from_form(user.id)
             db.session.add(binding)
@@ -712,7 +1041,7 @@ def create_app():
         return render_template(
             "add_binding.html",
             user=user,
-            profiles=profiles,
+            profiles=_get_onebot_profiles(),
             defaults=DEFAULT_TEMPLATES,
             placeholder_hint=PLACEHOLDER_HINT,
             html_defaults=DEFAULT_HTML_TEMPLATES,
@@ -725,9 +1054,7 @@ def create_app():
     @app.route("/admin/bindings/edit/<int:binding_id>", methods=["GET", "POST"])
     @admin_required
     def admin_binding_edit(binding_id):
-        binding = BiliBinding.query.get_or_404(binding_id)
-        profiles = OneBotProfile.query.order_by(OneBotProfile.id.desc()).all()
-        dynamics = _get_recent_dynamics(binding.user)
+        binding = _get_binding_with_user_or_404(binding_id)
         if request.method == "POST":
             _update_binding_from_form(binding)
             db.session.commit()
@@ -736,12 +1063,15 @@ def create_app():
             flash("绑定已更新", "success")
             return redirect(url_for("admin_bindings", user_id=binding.user_id))
 
-        binding.screenshot_template_dynamic = get_screenshot_template_value(binding.id, "dynamic")
-        binding.screenshot_template_live = get_screenshot_template_value(binding.id, "live")
+        dynamics = _get_recent_dynamics(binding.user)
+        (
+            binding.screenshot_template_dynamic,
+            binding.screenshot_template_live,
+        ) = get_screenshot_template_pair(binding.id)
         return render_template(
             "edit_binding.html",
             binding=binding,
-            profiles=profiles,
+            profiles=_get_onebot_profiles(),
             defaults=DEFAULT_TEMPLATES,
             placeholder_hint=PLACEHOLDER_HINT,
             html_defaults=DEFAULT_HTML_TEMPLATES,
@@ -754,14 +1084,14 @@ def create_app():
     @app.route("/admin/bindings/delete/<int:binding_id>", methods=["POST"])
     @admin_required
     def admin_binding_delete(binding_id):
-        binding = BiliBinding.query.get_or_404(binding_id)
+        binding = _get_binding_with_user_or_404(binding_id)
         user_id = binding.user_id
         uid = binding.user.uid if binding.user else None
         delete_screenshot_templates(binding.id)
         db.session.delete(binding)
         db.session.commit()
         if uid:
-            remaining = BiliBinding.query.filter_by(user_id=user_id).count()
+            remaining = _count_bindings_for_user(user_id)
             if remaining == 0:
                 delete_status(user_id)
                 _reset_monitor_state(uid)
@@ -786,7 +1116,6 @@ def create_app():
     @user_required
     def user_binding_new():
         user = BiliUser.query.get_or_404(current_user.user_id)
-        profiles = OneBotProfile.query.order_by(OneBotProfile.id.desc()).all()
         if request.method == "POST":
             binding = _build_binding_from_form(user.id)
             db.session.add(binding)
@@ -799,7 +1128,7 @@ def create_app():
         return render_template(
             "add_binding.html",
             user=user,
-            profiles=profiles,
+            profiles=_get_onebot_profiles(),
             defaults=DEFAULT_TEMPLATES,
             placeholder_hint=PLACEHOLDER_HINT,
             html_defaults=DEFAULT_HTML_TEMPLATES,
@@ -812,12 +1141,10 @@ def create_app():
     @app.route("/me/bindings/edit/<int:binding_id>", methods=["GET", "POST"])
     @user_required
     def user_binding_edit(binding_id):
-        binding = BiliBinding.query.get_or_404(binding_id)
+        binding = _get_binding_with_user_or_404(binding_id)
         if binding.user_id != current_user.user_id:
             flash("无权限编辑该绑定", "error")
             return redirect(url_for("user_bindings"))
-        profiles = OneBotProfile.query.order_by(OneBotProfile.id.desc()).all()
-        dynamics = _get_recent_dynamics(binding.user)
         if request.method == "POST":
             _update_binding_from_form(binding)
             db.session.commit()
@@ -826,12 +1153,15 @@ def create_app():
             flash("绑定已更新", "success")
             return redirect(url_for("user_bindings"))
 
-        binding.screenshot_template_dynamic = get_screenshot_template_value(binding.id, "dynamic")
-        binding.screenshot_template_live = get_screenshot_template_value(binding.id, "live")
+        dynamics = _get_recent_dynamics(binding.user)
+        (
+            binding.screenshot_template_dynamic,
+            binding.screenshot_template_live,
+        ) = get_screenshot_template_pair(binding.id)
         return render_template(
             "edit_binding.html",
             binding=binding,
-            profiles=profiles,
+            profiles=_get_onebot_profiles(),
             defaults=DEFAULT_TEMPLATES,
             placeholder_hint=PLACEHOLDER_HINT,
             html_defaults=DEFAULT_HTML_TEMPLATES,
@@ -844,7 +1174,7 @@ def create_app():
     @app.route("/me/bindings/delete/<int:binding_id>", methods=["POST"])
     @user_required
     def user_binding_delete(binding_id):
-        binding = BiliBinding.query.get_or_404(binding_id)
+        binding = _get_binding_with_user_or_404(binding_id)
         if binding.user_id != current_user.user_id:
             flash("无权限删除该绑定", "error")
             return redirect(url_for("user_bindings"))
@@ -853,7 +1183,7 @@ def create_app():
         db.session.delete(binding)
         db.session.commit()
         if uid:
-            remaining = BiliBinding.query.filter_by(user_id=binding.user_id).count()
+            remaining = _count_bindings_for_user(binding.user_id)
             if remaining == 0:
                 delete_status(binding.user_id)
                 _reset_monitor_state(uid)
@@ -868,13 +1198,14 @@ def create_app():
             current_pwd = request.form.get("current_password", "")
             new_pwd = request.form.get("new_password", "")
             if user.password_hash:
-                if not check_password_hash(user.password_hash, current_pwd):
+                if not _check_password(user.password_hash, current_pwd):
                     flash("当前密码不正确", "error")
                     return redirect(url_for("user_password"))
             if not new_pwd:
                 flash("新密码不能为空", "error")
                 return redirect(url_for("user_password"))
-            user.password_hash = generate_password_hash(new_pwd)
+            user.password_hash = _hash_password(new_pwd)
+            _invalidate_password_cache(f"user:{user.id}")
             db.session.commit()
             flash("密码已更新", "success")
             return redirect(url_for("user_bindings"))
@@ -895,8 +1226,20 @@ def create_app():
             ac_time_value = request.form.get("ac_time_value", "").strip()
 
             if action == "clear":
-                _clear_user_credential(user)
-                db.session.commit()
+                # 本来就是空凭据时不落一次无意义的写。
+                if any(
+                    (
+                        user.cookie,
+                        user.sessdata,
+                        user.bili_jct,
+                        user.buvid3,
+                        user.buvid4,
+                        user.dedeuserid,
+                        user.ac_time_value,
+                    )
+                ):
+                    _clear_user_credential(user)
+                    db.session.commit()
                 flash("凭据已清空", "success")
                 return redirect(url_for("user_credential"))
 
@@ -932,8 +1275,11 @@ def create_app():
             user.buvid4 = payload.get("buvid4", "")
             user.dedeuserid = payload.get("dedeuserid", "")
             user.ac_time_value = payload.get("ac_time_value", "")
+            _invalidate_credential_payload_cache(user.id)
 
-            db.session.commit()
+            # 提交的值与库里相同（重复点保存）时跳过 WAL 写。
+            if db.session.is_modified(user):
+                db.session.commit()
             ok, message = _test_user_credential(user)
             if ok is True:
                 flash("凭据已保存，验证通过", "success")
@@ -958,6 +1304,10 @@ def create_app():
     def admin_message():
         bindings = (
             BiliBinding.query.join(BiliUser)
+            .options(
+                db.contains_eager(BiliBinding.user),
+                db.joinedload(BiliBinding.onebot_profile),
+            )
             .order_by(BiliUser.id.desc(), BiliBinding.id.desc())
             .all()
         )
@@ -975,7 +1325,11 @@ def create_app():
             elif not message:
                 error = "消息内容不能为空"
             else:
-                binding = BiliBinding.query.get_or_404(int(selected_id))
+                binding = (
+                    BiliBinding.query.options(db.joinedload(BiliBinding.onebot_profile))
+                    .filter_by(id=int(selected_id))
+                    .first_or_404()
+                )
                 if not binding.enable_onebot:
                     error = "该绑定未启用 OneBot 通知"
                     return render_template(
@@ -1025,17 +1379,15 @@ def create_app():
         if current_user.is_admin:
             uid_filter = uid
         else:
-            user = BiliUser.query.get(current_user.user_id)
+            user = db.session.get(BiliUser, current_user.user_id)
             uid_filter = user.uid if user else ""
 
-        entries = _read_log_entries(max_lines=3000)
-        base_entries = entries
-        entries = _filter_log_entries(entries, level, logger_q, keyword, uid_filter)
-        entries = entries[-limit:]
-        entries.reverse()
-
-        logger_options = sorted({e.get("logger") for e in base_entries if e.get("logger")})
-        uid_options = sorted({e.get("uid") for e in base_entries if e.get("uid")})
+        entries = _read_log_entries(level, logger_q, keyword, uid_filter, limit)
+        try:
+            max_log_id = db.session.execute(select(func.max(BiliLogEntry.id))).scalar()
+        except Exception:
+            max_log_id = None
+        logger_options, uid_options = _log_filter_options(max_log_id)
 
         return render_template(
             "logs.html",
@@ -1103,9 +1455,10 @@ def create_app():
     def api_users():
         users = BiliUser.query.order_by(BiliUser.id.desc()).all()
         global_interval = get_global_poll_interval()
+        statuses = get_statuses([u.id for u in users])
         payload = []
         for u in users:
-            status = get_status(u.id) or {}
+            status = statuses.get(u.id) or {}
             interval = u.poll_interval or global_interval
             next_poll_at = status.get("next_poll_at")
             if not next_poll_at and status.get("checked_at"):
@@ -1139,11 +1492,40 @@ def create_app():
                     "next_poll_at": next_poll_at,
                 }
             )
+        if orjson is not None:
+            return Response(orjson.dumps(payload), mimetype="application/json")
         return jsonify(payload)
 
     return app
 
 
+def _count_bindings_for_user(user_id: int) -> int:
+    # Core count so the check stays an index-only probe on user_id.
+    return (
+        db.session.execute(
+            select(func.count())
+            .select_from(BiliBinding)
+            .where(BiliBinding.user_id == user_id)
+        ).scalar()
+        or 0
+    )
+
+
+def _get_binding_with_user_or_404(binding_id: int) -> BiliBinding:
+    return (
+        BiliBinding.query.options(db.joinedload(BiliBinding.user))
+        .filter_by(id=binding_id)
+        .first_or_404()
+    )
+
+
+def _get_onebot_profiles() -> list[OneBotProfile]:
+    # Memoized per request: the binding forms only need the list when rendering.
+    if not hasattr(g, "_onebot_profiles"):
+        g._onebot_profiles = OneBotProfile.query.order_by(OneBotProfile.id.desc()).all()
+    return g._onebot_profiles
+
+
 def _find_user_by_login(login_name: str) -> BiliUser | None:
     if not login_name:
         return None
@@ -1153,11 +1535,9 @@ def _find_user_by_login(login_name: str) -> BiliUser | None:
     return BiliUser.query.filter_by(uid=login_name).first()
 
 
-def _parse_cookie(cookie: str) -> dict:
-    if not cookie:
-        return {}
-    data = {}
-    keys = (
+_COOKIE_KV_RE = re.compile(r"([^=;\s]+)=([^;]*)")
+_COOKIE_KEYS = frozenset(
+    {
         "SESSDATA",
         "bili_jct",
         "buvid3",
@@ -1165,12 +1545,25 @@ def _parse_cookie(cookie: str) -> dict:
         "DedeUserID",
         "ac_time_value",
         "ac_time",
-    )
-    for key in keys:
-        match = re.search(rf"(?:^|;)\s*{re.escape(key)}=([^;]*)", cookie)
-        if match:
-            data[key] = match.group(1)
-    return data
+    }
+)
+
+
+def _parse_cookie(cookie: str) -> dict:
+    if not cookie:
+        return {}
+    # One linear scan over the cookie string instead of one search per key.
+    return {
+        key: value
+        for key, value in _COOKIE_KV_RE.findall(cookie)
+        if key in _COOKIE_KEYS
+    }
+
+
+def _invalidate_credential_payload_cache(user_id: int):
+    cache = getattr(g, "_cred_payload_cache", None)
+    if cache is not None:
+        cache.pop(user_id, None)
 
 
 def _clear_user_credential(user: BiliUser):
@@ -1181,18 +1574,27 @@ def _clear_user_credential(user: BiliUser):
     user.buvid4 = ""
     user.dedeuserid = ""
     user.ac_time_value = ""
+    _invalidate_credential_payload_cache(user.id)
 
 
 def _build_user_credential_payload(user: BiliUser) -> dict:
-    return {
-        "cookie": user.cookie or "",
-        "sessdata": user.sessdata or "",
-        "bili_jct": user.bili_jct or "",
-        "buvid3": user.buvid3 or "",
-        "buvid4": user.buvid4 or "",
-        "dedeuserid": user.dedeuserid or "",
-        "ac_time_value": user.ac_time_value or "",
-    }
+    # 同一请求里多个辅助函数会对同一用户反复要这份字典，按用户缓存在 g 上。
+    # 调用方不要原地改写返回值，需要改时先 dict() 拷贝。
+    cache = getattr(g, "_cred_payload_cache", None)
+    if cache is None:
+        cache = g._cred_payload_cache = {}
+    payload = cache.get(user.id)
+    if payload is None:
+        payload = cache[user.id] = {
+            "cookie": user.cookie or "",
+            "sessdata": user.sessdata or "",
+            "bili_jct": user.bili_jct or "",
+            "buvid3": user.buvid3 or "",
+            "buvid4": user.buvid4 or "",
+            "dedeuserid": user.dedeuserid or "",
+            "ac_time_value": user.ac_time_value or "",
+        }
+    return payload
 
 
 def _build_credential_payload_from_form(
@@ -1205,27 +1607,25 @@ def _build_credential_payload_from_form(
     dedeuserid: str,
     ac_time_value: str,
 ) -> dict:
-    payload = _build_user_credential_payload(user)
+    payload = dict(_build_user_credential_payload(user))
     parsed = _parse_cookie(cookie_input) if cookie_input else {}
     if cookie_input:
         payload["cookie"] = cookie_input
-    if sessdata or parsed.get("SESSDATA"):
-        payload["sessdata"] = sessdata or parsed.get("SESSDATA") or payload["sessdata"]
-    if bili_jct or parsed.get("bili_jct"):
-        payload["bili_jct"] = bili_jct or parsed.get("bili_jct") or payload["bili_jct"]
-    if buvid3 or parsed.get("buvid3"):
-        payload["buvid3"] = buvid3 or parsed.get("buvid3") or payload["buvid3"]
-    if buvid4 or parsed.get("buvid4"):
-        payload["buvid4"] = buvid4 or parsed.get("buvid4") or payload["buvid4"]
-    if dedeuserid or parsed.get("DedeUserID"):
-        payload["dedeuserid"] = (
-            dedeuserid or parsed.get("DedeUserID") or payload["dedeuserid"]
-        )
-    parsed_actime = parsed.get("ac_time_value") or parsed.get("ac_time")
-    if ac_time_value or parsed_actime:
-        payload["ac_time_value"] = (
-            ac_time_value or parsed_actime or payload["ac_time_value"]
-        )
+    if parsed.get("ac_time") and not parsed.get("ac_time_value"):
+        parsed["ac_time_value"] = parsed["ac_time"]
+    # 表单值优先，其次 cookie 解析值，均为空则保留原值。
+    fields = (
+        ("sessdata", sessdata, "SESSDATA"),
+        ("bili_jct", bili_jct, "bili_jct"),
+        ("buvid3", buvid3, "buvid3"),
+        ("buvid4", buvid4, "buvid4"),
+        ("dedeuserid", dedeuserid, "DedeUserID"),
+        ("ac_time_value", ac_time_value, "ac_time_value"),
+    )
+    for payload_key, form_value, cookie_key in fields:
+        value = form_value or parsed.get(cookie_key)
+        if value:
+            payload[payload_key] = value
     return payload
 
 
@@ -1234,6 +1634,10 @@ def _test_credential_payload(uid: str, payload: dict) -> tuple[bool | None, str]
         return False, "UID 为空"
     if not any(payload.values()):
         return None, "empty"
+    # 没有 SESSDATA 的凭据读接口必然失败，直接判掉，省一次对 B 站的往返；
+    # bili_jct 只有写接口才用，缺了不影响校验。
+    if not payload.get("sessdata"):
+        return False, "凭据不完整（缺少 SESSDATA）"
     try:
         data = fetch_user_info(uid, payload)
         if data:
@@ -1268,15 +1672,52 @@ def _build_view_user(
     )
 
 
-def _read_log_entries(max_lines: int = 2000) -> list[dict]:
-    entries = []
+def _tail_lines(path: str, n: int) -> list[str]:
+    # 从文件尾部按块回读最后 n 行，避免为取末尾把整个日志文件读一遍。
+    chunk_size = 64 * 1024
+    chunks = []
+    newlines = 0
     try:
-        rows = (
-            BiliLogEntry.query.order_by(BiliLogEntry.id.desc())
-            .limit(max_lines)
-            .all()
-        )
-        for row in reversed(rows):
+        with open(path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            pos = handle.tell()
+            while pos > 0 and newlines <= n:
+                read_size = min(chunk_size, pos)
+                pos -= read_size
+                handle.seek(pos)
+                chunk = handle.read(read_size)
+                chunks.append(chunk)
+                newlines += chunk.count(b"\n")
+    except OSError:
+        return []
+    data = b"".join(reversed(chunks))
+    lines = data.decode("utf-8", errors="ignore").splitlines()
+    return lines[-n:]
+
+
+def _read_log_entries(
+    level: str = "ALL",
+    logger_q: str = "",
+    keyword: str = "",
+    uid: str = "",
+    limit: int = 200,
+) -> list[dict]:
+    # 过滤和截断都推给数据库，避免把几千行日志拉进 Python 再丢弃。
+    try:
+        query = BiliLogEntry.query
+        if level and level != "ALL":
+            query = query.filter(BiliLogEntry.level == level)
+        if logger_q:
+            query = query.filter(BiliLogEntry.logger.ilike(f"%{logger_q}%"))
+        if keyword:
+            query = query.filter(BiliLogEntry.message.ilike(f"%{keyword}%"))
+        if uid:
+            query = query.filter(
+                or_(BiliLogEntry.uid == uid, BiliLogEntry.message.like(f"%{uid}%"))
+            )
+        rows = query.order_by(BiliLogEntry.id.desc()).limit(limit).all()
+        entries = []
+        for row in rows:
             item = {
                 "time": row.time or "",
                 "level": row.level or "INFO",
@@ -1289,7 +1730,7 @@ def _read_log_entries(max_lines: int = 2000) -> list[dict]:
             }
             if row.payload:
                 try:
-                    payload = json.loads(row.payload)
+                    payload = _loads_log_payload(row.payload)
                     if isinstance(payload, dict):
                         item.update(payload)
                 except Exception:
@@ -1297,17 +1738,17 @@ def _read_log_entries(max_lines: int = 2000) -> list[dict]:
             entries.append(item)
         return entries
     except Exception:
-        entries = []
+        pass
+    # 数据库不可用时回退到 JSON 行日志文件，仍在 Python 里过滤。
+    entries = []
     if not LOG_FILE or not os.path.exists(LOG_FILE):
         return entries
-    with open(LOG_FILE, "r", encoding="utf-8", errors="ignore") as handle:
-        lines = deque(handle, maxlen=max_lines)
-    for line in lines:
+    for line in _tail_lines(LOG_FILE, 3000):
         raw = line.strip()
         if not raw:
             continue
         try:
-            payload = json.loads(raw)
+            payload = _loads_log_payload(raw)
             if isinstance(payload, dict):
                 entries.append(payload)
         except Exception:
@@ -1320,9 +1761,35 @@ def _read_log_entries(max_lines: int = 2000) -> list[dict]:
                     "uid": "",
                 }
             )
+    entries = _filter_log_entries(entries, level, logger_q, keyword, uid)
+    entries = entries[-limit:]
+    entries.reverse()
     return entries
 
 
+@lru_cache(maxsize=1)
+def _log_filter_options(max_id: int | None) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    # 以日志表当前最大 id 作缓存键：没有新日志时重复刷新页面不再扫表。
+    try:
+        loggers = tuple(
+            value
+            for (value,) in db.session.execute(
+                select(BiliLogEntry.logger).distinct().order_by(BiliLogEntry.logger)
+            )
+            if value
+        )
+        uids = tuple(
+            value
+            for (value,) in db.session.execute(
+                select(BiliLogEntry.uid).distinct().order_by(BiliLogEntry.uid)
+            )
+            if value
+        )
+        return loggers, uids
+    except Exception:
+        return (), ()
+
+
 def _filter_log_entries(
     entries: list[dict],
     level: str,
@@ -1330,28 +1797,42 @@ def _filter_log_entries(
     keyword: str,
     uid: str,
 ) -> list[dict]:
-    filtered = []
-    for item in entries:
-        if uid:
-            item_uid = str(item.get("uid") or "")
-            if item_uid != str(uid):
-                message = str(item.get("message") or "")
-                if str(uid) not in message:
-                    continue
-        if level and level != "ALL" and item.get("level") != level:
-            continue
-        if logger_q and logger_q.lower() not in str(item.get("logger") or "").lower():
-            continue
-        if keyword and keyword.lower() not in str(item.get("message") or "").lower():
-            continue
-        filtered.append(item)
-    return filtered
+    # 只为启用的条件各建一个谓词，逐行循环里不再重复判断哪些过滤器生效。
+    checks = []
+    if uid:
+        uid_s = str(uid)
+
+        def _match_uid(item, uid_s=uid_s):
+            if str(item.get("uid") or "") == uid_s:
+                return True
+            return uid_s in str(item.get("message") or "")
+
+        checks.append(_match_uid)
+    if level and level != "ALL":
+        checks.append(lambda item, level=level: item.get("level") == level)
+    if logger_q:
+        logger_l = logger_q.lower()
+        checks.append(
+            lambda item, lq=logger_l: lq in str(item.get("logger") or "").lower()
+        )
+    if keyword:
+        keyword_l = keyword.lower()
+        checks.append(
+            lambda item, kw=keyword_l: kw in str(item.get("message") or "").lower()
+        )
+    if not checks:
+        return entries
+    return [item for item in entries if all(check(item) for check in checks)]
 
 
 def _test_user_credential(user: BiliUser) -> tuple[bool | None, str]:
     payload = _build_user_credential_payload(user)
     if not any(payload.values()):
         return None, "empty"
+    # 没有 SESSDATA 的凭据读接口必然失败，直接判掉，省一次对 B 站的往返；
+    # bili_jct 只有写接口才用，缺了不影响校验。
+    if not payload.get("sessdata"):
+        return False, "凭据不完整（缺少 SESSDATA）"
     try:
         data = fetch_user_info(user.uid, payload)
         if data:
@@ -1375,21 +1856,34 @@ def _resolve_binding_settings(binding: BiliBinding) -> dict:
     }
 
 
+@lru_cache(maxsize=4096)
+def _cached_url_for(endpoint: str, **values) -> str:
+    # 仅缓存固定 endpoint + 简单参数的站内地址；不要用于 _external 链接。
+    return url_for(endpoint, **values)
+
+
 def _binding_edit_redirect(binding: BiliBinding):
     if getattr(current_user, "is_admin", False):
-        return url_for("admin_binding_edit", binding_id=binding.id)
-    return url_for("user_binding_edit", binding_id=binding.id)
+        return _cached_url_for("admin_binding_edit", binding_id=binding.id)
+    return _cached_url_for("user_binding_edit", binding_id=binding.id)
+
+
+# 模板键 -> 绑定属性名，避免每次调用都拼 f-string。
+_TEMPLATE_ATTRS = {
+    key: f"template_{key}"
+    for key in ("dynamic", "video", "live_start", "live_hourly", "live_end")
+}
 
 
 def _get_binding_template(binding: BiliBinding, key: str) -> str:
-    template = getattr(binding, f"template_{key}", "") or ""
+    template = getattr(binding, _TEMPLATE_ATTRS.get(key, ""), "") or ""
     if template:
         return template
     return DEFAULT_TEMPLATES.get(key, "")
 
 
 def _get_recent_dynamics(user: BiliUser, limit: int = 10) -> list[dict]:
-    items = fetch_dynamic_list(user.uid, credential_data=_build_user_credential_payload(user))
+    items = _fetch_dynamic_list_cached(user)
     if not items:
         return []
     results = []
@@ -1404,16 +1898,32 @@ def _get_recent_dynamics(user: BiliUser, limit: int = 10) -> list[dict]:
     return results
 
 
+def _fetch_dynamic_list_cached(user: BiliUser) -> list:
+    # 同一请求里（编辑页渲染 + 测试发送）只向 B 站拉一次动态列表。
+    cache = getattr(g, "_dynamic_list_cache", None)
+    if cache is None:
+        cache = g._dynamic_list_cache = {}
+    if user.uid not in cache:
+        cache[user.uid] = fetch_dynamic_list(
+            user.uid, credential_data=_build_user_credential_payload(user)
+        )
+    return cache[user.uid]
+
+
 def _find_dynamic_for_test(user: BiliUser, dynamic_id: str) -> dict | None:
     if not dynamic_id:
         return None
-    items = fetch_dynamic_list(user.uid, credential_data=_build_user_credential_payload(user))
+    items = _fetch_dynamic_list_cached(user)
     if not items:
         return None
     for item in items:
-        info = _parse_dynamic_item(item)
-        if info and info.get("id") == dynamic_id:
-            return info
+        # 先比对 id 再做完整解析，避免为每个候选项都提取媒体/卡片。
+        if not isinstance(item, dict):
+            continue
+        dyn_id = item.get("id_str") or item.get("id")
+        if dyn_id is None or str(dyn_id) != dynamic_id:
+            continue
+        return _parse_dynamic_item(item)
     return None
 
 
@@ -1591,146 +2101,150 @@ def _collect_image_urls(major: dict) -> list[str]:
         if cover:
             images.append(_normalize_url(str(cover)))
 
-    cleaned = []
-    seen = set()
-    for url in images:
-        if not url or url in seen:
-            continue
-        seen.add(url)
-        cleaned.append(url)
-    return cleaned
+    # 每条 append 都带非空判断，这里只需按序去重。
+    return list(dict.fromkeys(images))
+
+
+# 每条：major 里的候选键 -> (标题键, 描述键, 链接键, 封面键)，按声明顺序取第一个非空值。
+_EXTRA_CARD_SPECS = (
+    (("common",), ("title", "name"), ("desc", "summary"), ("jump_url", "url"), ("cover",)),
+    (("article",), ("title",), ("desc", "summary"), ("jump_url", "url"), ("cover",)),
+    (("archive",), ("title",), ("desc", "desc_text"), ("jump_url", "url"), ("cover",)),
+    (
+        ("live_rcmd", "live"),
+        ("title", "roomname"),
+        ("desc", "intro"),
+        ("link", "url"),
+        ("cover", "keyframe"),
+    ),
+    (("reserve",), ("title",), ("desc", "desc1", "desc2"), ("jump_url",), ("cover",)),
+    (("opus",), ("title",), ("summary", "content"), ("jump_url", "url"), ("cover",)),
+    (
+        ("topic",),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+    (
+        ("medialist", "collection", "fav"),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+    (
+        ("activity", "mission", "courses"),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+)
+
+
+def _first_value(node: dict, keys: tuple) -> str:
+    for key in keys:
+        value = node.get(key)
+        if value:
+            return value
+    return ""
+
+
+# 常见备选键位，按声明顺序取第一个非空值，替代层层 .get() or 链。
+_AVATAR_KEYS = ("face", "avatar")
+_RICH_NODE_KEYS = ("rich_text_nodes", "nodes")
+_TEXT_CONTENT_KEYS = ("text", "content", "summary")
+_OPUS_TEXT_KEYS = ("content", "text")
+_LIVE_TITLE_KEYS = ("title", "roomname")
+_LIVE_ONLINE_KEYS = ("online", "online_num")
+_ROOM_ID_KEYS = ("roomid", "room_id")
+_LIVE_START_KEYS = ("live_time", "start_time")
 
 
 def _extract_extra_card(major: dict) -> dict:
-    common = major.get("common")
-    if isinstance(common, dict):
-        return {
-            "title": common.get("title") or common.get("name") or "",
-            "desc": common.get("desc") or common.get("summary") or "",
-            "url": _normalize_url(common.get("jump_url") or common.get("url") or ""),
-            "cover": _normalize_url(common.get("cover") or ""),
-        }
-    article = major.get("article")
-    if isinstance(article, dict):
-        return {
-            "title": article.get("title") or "",
-            "desc": article.get("desc") or article.get("summary") or "",
-            "url": _normalize_url(article.get("jump_url") or article.get("url") or ""),
-            "cover": _normalize_url(article.get("cover") or ""),
-        }
-    archive = major.get("archive")
-    if isinstance(archive, dict):
-        return {
-            "title": archive.get("title") or "",
-            "desc": archive.get("desc") or archive.get("desc_text") or "",
-            "url": _normalize_url(archive.get("jump_url") or archive.get("url") or ""),
-            "cover": _normalize_url(archive.get("cover") or ""),
-        }
-    live = major.get("live_rcmd") or major.get("live")
-    if isinstance(live, dict):
-        return {
-            "title": live.get("title") or live.get("roomname") or "",
-            "desc": live.get("desc") or live.get("intro") or "",
-            "url": _normalize_url(live.get("link") or live.get("url") or ""),
-            "cover": _normalize_url(live.get("cover") or live.get("keyframe") or ""),
-        }
-    reserve = major.get("reserve")
-    if isinstance(reserve, dict):
-        return {
-            "title": reserve.get("title") or "",
-            "desc": reserve.get("desc") or reserve.get("desc1") or reserve.get("desc2") or "",
-            "url": _normalize_url(reserve.get("jump_url") or ""),
-            "cover": _normalize_url(reserve.get("cover") or ""),
-        }
-    opus = major.get("opus")
-    if isinstance(opus, dict):
-        return {
-            "title": opus.get("title") or "",
-            "desc": opus.get("summary") or opus.get("content") or "",
-            "url": _normalize_url(opus.get("jump_url") or opus.get("url") or ""),
-            "cover": _normalize_url(opus.get("cover") or ""),
-        }
-    topic = major.get("topic")
-    if isinstance(topic, dict):
-        return {
-            "title": topic.get("title") or topic.get("name") or "",
-            "desc": topic.get("desc") or topic.get("summary") or "",
-            "url": _normalize_url(topic.get("jump_url") or topic.get("url") or ""),
-            "cover": _normalize_url(topic.get("cover") or topic.get("image") or ""),
-        }
-    medialist = major.get("medialist") or major.get("collection") or major.get("fav")
-    if isinstance(medialist, dict):
-        return {
-            "title": medialist.get("title") or medialist.get("name") or "",
-            "desc": medialist.get("desc") or medialist.get("summary") or "",
-            "url": _normalize_url(medialist.get("jump_url") or medialist.get("url") or ""),
-            "cover": _normalize_url(medialist.get("cover") or medialist.get("image") or ""),
-        }
-    activity = major.get("activity") or major.get("mission") or major.get("courses")
-    if isinstance(activity, dict):
+    for node_keys, title_keys, desc_keys, url_keys, cover_keys in _EXTRA_CARD_SPECS:
+        node = None
+        for key in node_keys:
+            node = major.get(key)
+            if node:
+                break
+        if not isinstance(node, dict):
+            continue
         return {
-            "title": activity.get("title") or activity.get("name") or "",
-            "desc": activity.get("desc") or activity.get("summary") or "",
-            "url": _normalize_url(activity.get("jump_url") or activity.get("url") or ""),
-            "cover": _normalize_url(activity.get("cover") or activity.get("image") or ""),
+            "title": _first_value(node, title_keys),
+            "desc": _first_value(node, desc_keys),
+            "url": _normalize_url(_first_value(node, url_keys)),
+            "cover": _normalize_url(_first_value(node, cover_keys)),
         }
     return {}
 
 
-def _build_media_html(images: list[str], extra: dict) -> str:
-    parts = []
+# 媒体卡片的固定 HTML 片段，% 填充比每次重建 f-string 便宜。
+_escape = html_lib.escape
+_IMG_TPL = '<img class="media-img" src="%s" />'
+_COVER_TPL = '<img class="media-cover" src="%s" />'
+_TITLE_TPL = '<div class="media-title">%s</div>'
+_DESC_TPL = '<div class="media-desc">%s</div>'
+_LINK_TPL = '<div class="media-link">%s</div>'
+
+
+# 热路径函数用默认参数把模块级查找固化成 LOAD_FAST（对调用方不可见）。
+def _build_media_html(images: list[str], extra: dict, escape=_escape) -> str:
+    html = ""
     if images:
-        imgs = []
-        seen = set()
-        for url in images:
-            if url in seen:
-                continue
-            seen.add(url)
-            if len(imgs) >= 9:
-                break
-            safe_url = html_lib.escape(url, quote=True)
-            imgs.append(f'<img class="media-img" src="{safe_url}" />')
-        parts.append(f'<div class="media-grid">{"".join(imgs)}</div>')
+        imgs = ""
+        # dict.fromkeys 去重保序，九宫格最多取前 9 张。
+        for url in list(dict.fromkeys(images))[:9]:
+            imgs += _IMG_TPL % escape(url, quote=True)
+        html += f'<div class="media-grid">{imgs}</div>'
 
     if isinstance(extra, dict):
-        title = _stringify(extra.get("title"))
-        desc = _stringify(extra.get("desc"))
-        url = _stringify(extra.get("url"))
-        cover = _stringify(extra.get("cover"))
+        stringify = _stringify
+        title = stringify(extra.get("title"))
+        desc = stringify(extra.get("desc"))
+        url = stringify(extra.get("url"))
+        cover = stringify(extra.get("cover"))
         if images and cover and not (title or desc or url):
             cover = ""
         if images and cover and (title or desc or url):
             cover = ""
         if title or desc or cover or url:
-            card = []
+            card = ""
             if cover:
-                card.append(
-                    f'<img class="media-cover" src="{html_lib.escape(cover, quote=True)}" />'
-                )
+                card += _COVER_TPL % escape(cover, quote=True)
             if title:
-                card.append(f'<div class="media-title">{html_lib.escape(title)}</div>')
+                card += _TITLE_TPL % escape(title)
             if desc:
-                card.append(f'<div class="media-desc">{html_lib.escape(desc)}</div>')
+                card += _DESC_TPL % escape(desc)
             if url:
-                card.append(f'<div class="media-link">{html_lib.escape(url)}</div>')
-            parts.append(f'<div class="media-card">{"".join(card)}</div>')
+                card += _LINK_TPL % escape(url)
+            html += f'<div class="media-card">{card}</div>'
 
-    return "".join(parts)
+    return html
+
+
+def _node_text(nodes) -> str:
+    # 列表推导整体跑在更紧的解释器循环里；type() is 判断同 _stringify。
+    return "".join([node.get("text") or "" for node in nodes if type(node) is dict])
 
 
 def _extract_desc_text(dynamic: dict) -> str:
     text = ""
     desc = dynamic.get("desc")
-    if isinstance(desc, dict):
+    # str 形态最常见，先行短路；type() is 判断同 _stringify。
+    t = type(desc)
+    if t is str:
+        text = desc
+    elif t is dict:
         text = desc.get("text") or ""
         if not text:
             nodes = desc.get("rich_text_nodes") or []
             if nodes:
-                text = "".join(node.get("text") or "" for node in nodes)
-    elif isinstance(desc, str):
-        text = desc
-    elif isinstance(desc, list):
-        text = "".join(str(x) for x in desc)
+                text = _node_text(nodes)
+    elif t is list:
+        for x in desc:
+            text += str(x)
     if not text:
         opus = (dynamic.get("major") or {}).get("opus")
         if isinstance(opus, dict):
@@ -1740,9 +2254,9 @@ def _extract_desc_text(dynamic: dict) -> str:
             elif isinstance(summary, str):
                 text = summary
             elif isinstance(summary, list):
-                text = "".join(node.get("text") or "" for node in summary if isinstance(node, dict))
+                text = _node_text(summary)
             if not text:
-                content = opus.get("content") or opus.get("text") or ""
+                content = _first_value(opus, _OPUS_TEXT_KEYS)
                 if content:
                     text = str(content)
     return text
@@ -1770,41 +2284,42 @@ def _extract_module_desc_text(module: dict | None) -> str:
     for key in ("desc", "comment", "content", "text", "summary"):
         value = module.get(key)
         if isinstance(value, dict):
-            text = value.get("text") or value.get("content") or value.get("summary") or ""
+            text = _first_value(value, _TEXT_CONTENT_KEYS)
             if text:
                 return str(text)
-            nodes = value.get("rich_text_nodes") or value.get("nodes")
+            nodes = _first_value(value, _RICH_NODE_KEYS)
             if isinstance(nodes, list):
-                return "".join(
-                    node.get("text") or "" for node in nodes if isinstance(node, dict)
-                )
+                return _node_text(nodes)
         elif isinstance(value, list):
-            return "".join(
-                node.get("text") or "" for node in value if isinstance(node, dict)
-            )
+            return _node_text(value)
         elif isinstance(value, str):
             return value
-    nodes = module.get("rich_text_nodes") or module.get("nodes")
+    nodes = _first_value(module, _RICH_NODE_KEYS)
     if isinstance(nodes, list):
-        return "".join(
-            node.get("text") or "" for node in nodes if isinstance(node, dict)
-        )
+        return _node_text(nodes)
     return ""
 
 
 def _extract_author_media(author: dict) -> tuple[str, str]:
     avatar = ""
     if isinstance(author, dict):
-        avatar = author.get("face") or author.get("avatar") or ""
+        avatar = _first_value(author, _AVATAR_KEYS)
     return _normalize_url(str(avatar)) if avatar else "", ""
 
 
 def _fetch_user_avatar(user: BiliUser) -> tuple[str, str]:
+    # 一次测试请求里取值和渲染都会要头像，按用户缓存省掉重复的远端调用。
+    cache = getattr(g, "_avatar_cache", None)
+    if cache is None:
+        cache = g._avatar_cache = {}
+    cached = cache.get(user.id)
+    if cached is not None:
+        return cached
     info = fetch_user_info(user.uid, _build_user_credential_payload(user))
-    if not info:
-        return "", ""
-    avatar = info.get("face") or info.get("avatar") or ""
-    return _normalize_url(str(avatar)) if avatar else "", ""
+    avatar = _first_value(info, _AVATAR_KEYS) if info else ""
+    result = (_normalize_url(str(avatar)) if avatar else "", "")
+    cache[user.id] = result
+    return result
 
 
 def _build_dynamic_test_values(user: BiliUser, info: dict, test_type: str) -> dict:
@@ -1891,12 +2406,12 @@ def _build_live_test_values(
     prefer_current = test_type in ("live_hourly", "live_end")
     allow_current = test_type != "live_start"
     if isinstance(info, dict):
-        title = info.get("title") or info.get("roomname") or ""
-        online = info.get("online") or info.get("online_num") or ""
-        room_id = info.get("roomid") or info.get("room_id") or ""
+        title = _first_value(info, _LIVE_TITLE_KEYS)
+        online = _first_value(info, _LIVE_ONLINE_KEYS)
+        room_id = _first_value(info, _ROOM_ID_KEYS)
         if room_id:
             url = f"https://live.bilibili.com/{room_id}"
-        start_ts = info.get("live_time") or info.get("start_time") or 0
+        start_ts = _first_value(info, _LIVE_START_KEYS) or 0
         start_value = _parse_live_start_ts(start_ts)
         if start_value:
             duration = format_duration(time.time() - start_value)
@@ -2015,15 +2530,16 @@ def _dynamic_html_values(name: str, info: dict) -> dict:
     cover = ""
     if not media_html:
         cover = info.get("cover_url") or (images[0] if images else "")
+    # 每个键只取一次，整个返回值保持单个字面量（CPython 可按大小预分配）。
+    text = info.get("text") or ""
     text_html = info.get("text_html")
     if not text_html:
-        text_plain = info.get("text") or ""
-        text_html = html_lib.escape(text_plain).replace("\n", "<br>")
+        text_html = html_lib.escape(text).replace("\n", "<br>")
     avatar = info.get("avatar") or ""
     return {
         "name": name,
         "name_initial": _name_initial(name),
-        "text": info.get("text") or "",
+        "text": text,
         "text_html": text_html,
         "title": title,
         "url": url,
@@ -2041,18 +2557,19 @@ def _dynamic_html_values(name: str, info: dict) -> dict:
 
 
 def _live_html_values(name: str, values: dict, cover_url: str) -> dict:
+    get = values.get
     cover = cover_url or ""
-    avatar = values.get("avatar") or ""
-    rec_display = values.get("rec_display") or "none"
+    avatar = get("avatar") or ""
+    rec_display = get("rec_display") or "none"
     return {
-        "name": values.get("name") or name,
+        "name": get("name") or name,
         "name_initial": _name_initial(name),
         "text": "",
-        "title": values.get("title") or "",
-        "url": values.get("url") or "",
-        "online": values.get("online") or "",
-        "duration": values.get("duration") or "",
-        "max_online": values.get("max_online") or "",
+        "title": get("title") or "",
+        "url": get("url") or "",
+        "online": get("online") or "",
+        "duration": get("duration") or "",
+        "max_online": get("max_online") or "",
         "cover": cover,
         "cover_display": "block" if cover else "none",
         "rec_display": rec_display,
@@ -2072,16 +2589,18 @@ def _render_html_image(template: str, values: dict) -> bytes | None:
 
 
 def _stringify(value) -> str:
+    # 绝大多数入参本来就是 str；type() is 比较不走 MRO，放在最前面。
+    t = type(value)
+    if t is str:
+        return value
     if value is None:
         return ""
-    if isinstance(value, str):
-        return value
-    if isinstance(value, dict):
+    if t is dict:
         for key in ("text", "desc", "summary", "title", "name"):
             val = value.get(key)
             if isinstance(val, str) and val:
                 return val
-        nodes = value.get("rich_text_nodes") or value.get("nodes")
+        nodes = _first_value(value, _RICH_NODE_KEYS)
         if isinstance(nodes, list):
             parts = []
             for node in nodes:
@@ -2091,7 +2610,7 @@ def _stringify(value) -> str:
                     parts.append(str(node))
             return "".join(parts)
         return str(value)
-    if isinstance(value, list):
+    if t is list:
         parts = []
         for item in value:
             if isinstance(item, dict):
@@ -2102,11 +2621,18 @@ def _stringify(value) -> str:
     return str(value)
 
 
+@lru_cache(maxsize=2048)
+def _format_timestamp_cached(ts: int) -> str:
+    # time.strftime 直接吃 struct_time，比构造 datetime 再 strftime 轻。
+    return time.strftime("%m-%d %H:%M", time.localtime(ts))
+
+
 def _format_timestamp(ts: int | float | None) -> str:
+    # 同一批动态反复格式化相同的发布时间，strftime 结果直接缓存命中。
     if not ts:
         return ""
     try:
-        return datetime.fromtimestamp(int(ts)).strftime("%m-%d %H:%M")
+        return _format_timestamp_cached(int(ts))
     except Exception:
         return ""
 
@@ -2137,22 +2663,37 @@ def _name_initial(name: str) -> str:
     return trimmed[:2]
 
 
-def _build_segments(template: str, values: dict, image_bytes: bytes | None):
-    parts = _SPECIAL_PATTERN.split(template)
+# 特殊标记 -> 段构造器；新增标记只需在这里登记，不用改 _build_segments 循环。
+_SEG_BUILDERS = {
+    "{SHOTPICTURE}": lambda image_bytes: (
+        _image_segment(image_bytes) if image_bytes else None
+    ),
+    "[atALL]": lambda image_bytes: {"type": "at", "data": {"qq": "all"}},
+}
+
+
+def _build_segments(
+    template: str,
+    values: dict,
+    image_bytes: bytes | None,
+    _split=_split_special,
+    _builders=_SEG_BUILDERS,
+):
+    parts = _split(template)
+    # 统一字符串化一次，后面每个片段替换时不再逐值 str()。
+    values = {key: "" if value is None else str(value) for key, value in values.items()}
     segments = []
     rich = False
     for part in parts:
         if not part:
             continue
-        if part == "{SHOTPICTURE}":
-            if image_bytes:
-                segments.append(_image_segment(image_bytes))
+        builder = _builders.get(part)
+        if builder is not None:
+            seg = builder(image_bytes)
+            if seg is not None:
+                segments.append(seg)
                 rich = True
             continue
-        if part == "[atALL]":
-            segments.append({"type": "at", "data": {"qq": "all"}})
-            rich = True
-            continue
         text = _apply_values(part, values)
         if text:
             segments.append({"type": "text", "data": {"text": text}})
@@ -2161,17 +2702,30 @@ def _build_segments(template: str, values: dict, image_bytes: bytes | None):
     return segments, rich
 
 
-def _apply_values(text: str, values: dict) -> str:
-    if not text:
-        return ""
-    for key, value in values.items():
-        text = text.replace(f"{{{key}}}", "" if value is None else str(value))
-    return text
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def _apply_values(text: str, values: dict, _resub=_PLACEHOLDER_RE.sub) -> str:
+    # 单次线性扫描替换全部占位符；未知占位符与孤立大括号保持原样。
+    if not text or "{" not in text:
+        return text or ""
+
+    def _sub(match):
+        key = match.group(1)
+        if key in values:
+            value = values[key]
+            return "" if value is None else str(value)
+        return match.group(0)
 
+    return _resub(_sub, text)
 
+
+# [截图 bytes, base64 结果]，一批推送内复用同一次编码。
 def _image_segment(image_bytes: bytes) -> dict:
-    image_b64 = base64.b64encode(image_bytes).decode("ascii")
-    return {"type": "image", "data": {"file": f"base64://{image_b64}"}}
+    # 这里跑在并发的请求线程上，直接按次编码；
+    # 单槽缓存只用在 monitor 的单 worker 派发线程里。
+    encoded = binascii.b2a_base64(image_bytes, newline=False).decode("ascii")
+    return {"type": "image", "data": {"file": f"base64://{encoded}"}}
 
 
 def _parse_live_hourly_interval(raw: str) -> int:
@@ -2187,93 +2741,53 @@ def _parse_live_hourly_interval(raw: str) -> int:
     return value
 
 
-def _build_binding_from_form(user_id: int) -> BiliBinding:
-    name = request.form.get("name", "").strip() or "默认"
-    onebot_profile_id = request.form.get("onebot_profile_id", "").strip()
-    onebot_ws_url = request.form.get("onebot_ws_url", "").strip()
-    onebot_access_token = request.form.get("onebot_access_token", "").strip()
-    onebot_target_type = request.form.get("onebot_target_type", "group").strip()
-    onebot_target_id = request.form.get("onebot_target_id", "").strip()
-    live_hourly_interval = _parse_live_hourly_interval(
-        request.form.get("live_hourly_interval", "").strip()
-    )
+# 绑定表单的普通文本列与开关列，新建/编辑共用同一份读取逻辑。
+_BINDING_STR_FIELDS = (
+    "onebot_ws_url",
+    "onebot_access_token",
+    "onebot_target_id",
+    "template_dynamic",
+    "template_video",
+    "template_live_start",
+    "template_live_hourly",
+    "template_live_end",
+)
+_BINDING_BOOL_FIELDS = (
+    "enable_onebot",
+    "notify_dynamic",
+    "notify_video",
+    "notify_live_start",
+    "notify_live_hourly",
+    "notify_live_end",
+    "enable_screenshot",
+)
 
-    enable_onebot = bool(request.form.get("enable_onebot"))
-    notify_dynamic = bool(request.form.get("notify_dynamic"))
-    notify_video = bool(request.form.get("notify_video"))
-    notify_live_start = bool(request.form.get("notify_live_start"))
-    notify_live_hourly = bool(request.form.get("notify_live_hourly"))
-    notify_live_end = bool(request.form.get("notify_live_end"))
-    enable_screenshot = bool(request.form.get("enable_screenshot"))
-
-    template_dynamic = request.form.get("template_dynamic", "").strip()
-    template_video = request.form.get("template_video", "").strip()
-    template_live_start = request.form.get("template_live_start", "").strip()
-    template_live_hourly = request.form.get("template_live_hourly", "").strip()
-    template_live_end = request.form.get("template_live_end", "").strip()
-    if onebot_profile_id == "":
-        onebot_profile_id = None
-    else:
-        try:
-            onebot_profile_id = int(onebot_profile_id)
-        except ValueError:
-            onebot_profile_id = None
-
-    return BiliBinding(
-        user_id=user_id,
-        name=name,
-        onebot_profile_id=onebot_profile_id,
-        onebot_ws_url=onebot_ws_url,
-        onebot_access_token=onebot_access_token,
-        onebot_target_type=onebot_target_type or "group",
-        onebot_target_id=onebot_target_id,
-        enable_onebot=enable_onebot,
-        notify_dynamic=notify_dynamic,
-        notify_video=notify_video,
-        notify_live_start=notify_live_start,
-        notify_live_hourly=notify_live_hourly,
-        notify_live_end=notify_live_end,
-        enable_screenshot=enable_screenshot,
-        live_hourly_interval=live_hourly_interval,
-        template_dynamic=template_dynamic,
-        template_video=template_video,
-        template_live_start=template_live_start,
-        template_live_hourly=template_live_hourly,
-        template_live_end=template_live_end,
+
+def _read_binding_form() -> dict:
+    form = request.form
+    data = {field: form.get(field, "").strip() for field in _BINDING_STR_FIELDS}
+    for field in _BINDING_BOOL_FIELDS:
+        data[field] = bool(form.get(field))
+    data["name"] = form.get("name", "").strip() or "默认"
+    data["onebot_target_type"] = form.get("onebot_target_type", "group").strip() or "group"
+    data["live_hourly_interval"] = _parse_live_hourly_interval(
+        form.get("live_hourly_interval", "").strip()
     )
+    profile_id = form.get("onebot_profile_id", "").strip()
+    try:
+        data["onebot_profile_id"] = int(profile_id) if profile_id else None
+    except ValueError:
+        data["onebot_profile_id"] = None
+    return data
 
 
-def _update_binding_from_form(binding: BiliBinding):
-    binding.name = request.form.get("name", "").strip() or "默认"
-    onebot_profile_id = request.form.get("onebot_profile_id", "").strip()
-    if onebot_profile_id:
-        try:
-            binding.onebot_profile_id = int(onebot_profile_id)
-        except ValueError:
-            binding.onebot_profile_id = None
-    else:
-        binding.onebot_profile_id = None
-    binding.onebot_ws_url = request.form.get("onebot_ws_url", "").strip()
-    binding.onebot_access_token = request.form.get("onebot_access_token", "").strip()
-    binding.onebot_target_type = request.form.get("onebot_target_type", "group").strip() or "group"
-    binding.onebot_target_id = request.form.get("onebot_target_id", "").strip()
-    binding.live_hourly_interval = _parse_live_hourly_interval(
-        request.form.get("live_hourly_interval", "").strip()
-    )
+def _build_binding_from_form(user_id: int) -> BiliBinding:
+    return BiliBinding(user_id=user_id, **_read_binding_form())
 
-    binding.enable_onebot = bool(request.form.get("enable_onebot"))
-    binding.notify_dynamic = bool(request.form.get("notify_dynamic"))
-    binding.notify_video = bool(request.form.get("notify_video"))
-    binding.notify_live_start = bool(request.form.get("notify_live_start"))
-    binding.notify_live_hourly = bool(request.form.get("notify_live_hourly"))
-    binding.notify_live_end = bool(request.form.get("notify_live_end"))
-    binding.enable_screenshot = bool(request.form.get("enable_screenshot"))
 
-    binding.template_dynamic = request.form.get("template_dynamic", "").strip()
-    binding.template_video = request.form.get("template_video", "").strip()
-    binding.template_live_start = request.form.get("template_live_start", "").strip()
-    binding.template_live_hourly = request.form.get("template_live_hourly", "").strip()
-    binding.template_live_end = request.form.get("template_live_end", "").strip()
+def _update_binding_from_form(binding: BiliBinding):
+    for field, value in _read_binding_form().items():
+        setattr(binding, field, value)
 
 
 def _read_screenshot_templates_from_form() -> tuple[str, str]:
@@ -2282,6 +2796,27 @@ def _read_screenshot_templates_from_form() -> tuple[str, str]:
     return template_dynamic, template_live
 
 
+# 主库结构版本号，存进 SQLite 的 PRAGMA user_version。
+# 每次给 _ensure_*_columns 增加新列/回填时 +1。
+_SCHEMA_REVISION = 4
+
+
+def _get_schema_revision() -> int:
+    try:
+        return int(db.session.execute(text("PRAGMA user_version")).scalar() or 0)
+    except Exception:
+        # 非 SQLite 后端没有该 PRAGMA，退化为每次启动都跑迁移。
+        return 0
+
+
+def _set_schema_revision(revision: int):
+    try:
+        db.session.execute(text(f"PRAGMA user_version = {int(revision)}"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
 def _ensure_user_columns():
     result = db.session.execute(text("PRAGMA table_info(bili_users)"))
     existing = {row[1] for row in result.fetchall()}
@@ -2307,21 +2842,54 @@ def _ensure_user_columns():
     for name, coltype in expected.items():
         if name not in existing:
             db.session.execute(text(f"ALTER TABLE bili_users ADD COLUMN {name} {coltype}"))
-    db.session.execute(text("UPDATE bili_users SET enabled=1 WHERE enabled IS NULL"))
+    # 所有回填合成一条 UPDATE；WHERE 兜底让干净库上这条语句不改任何行。
+    text_defaults = (
+        "password_hash",
+        "cookie",
+        "sessdata",
+        "bili_jct",
+        "buvid3",
+        "buvid4",
+        "dedeuserid",
+        "ac_time_value",
+    )
+    set_parts = [
+        "enabled=COALESCE(enabled, 1)",
+        "login_username=CASE WHEN login_username IS NULL OR login_username='' "
+        "THEN uid ELSE login_username END",
+        "poll_interval=COALESCE(poll_interval, 0)",
+    ]
+    where_parts = [
+        "enabled IS NULL",
+        "login_username IS NULL",
+        "login_username=''",
+        "poll_interval IS NULL",
+    ]
+    for name in text_defaults:
+        set_parts.append(f"{name}=COALESCE({name}, '')")
+        where_parts.append(f"{name} IS NULL")
     db.session.execute(
-        text("UPDATE bili_users SET login_username=uid WHERE login_username IS NULL OR login_username='' ")
+        text(
+            "UPDATE bili_users SET "
+            + ", ".join(set_parts)
+            + " WHERE "
+            + " OR ".join(where_parts)
+        )
+    )
+    # 老库补登录名唯一索引；建索引前先消重，重复的追加 id 后缀。
+    db.session.execute(
+        text(
+            "UPDATE bili_users SET login_username = login_username || '_' || id "
+            "WHERE id NOT IN "
+            "(SELECT MIN(id) FROM bili_users GROUP BY login_username)"
+        )
     )
     db.session.execute(
-        text("UPDATE bili_users SET password_hash='' WHERE password_hash IS NULL")
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_bili_users_login_username "
+            "ON bili_users (login_username)"
+        )
     )
-    db.session.execute(text("UPDATE bili_users SET cookie='' WHERE cookie IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET sessdata='' WHERE sessdata IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET bili_jct='' WHERE bili_jct IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET buvid3='' WHERE buvid3 IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET buvid4='' WHERE buvid4 IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET dedeuserid='' WHERE dedeuserid IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET ac_time_value='' WHERE ac_time_value IS NULL"))
-    db.session.execute(text("UPDATE bili_users SET poll_interval=0 WHERE poll_interval IS NULL"))
     db.session.commit()
 
 
@@ -2378,86 +2946,105 @@ def _ensure_binding_columns():
         if name not in existing:
             db.session.execute(text(f"ALTER TABLE bili_bindings ADD COLUMN {name} {coltype}"))
 
-    db.session.execute(text("UPDATE bili_bindings SET enable_onebot=1 WHERE enable_onebot IS NULL"))
-    db.session.execute(text("UPDATE bili_bindings SET notify_dynamic=1 WHERE notify_dynamic IS NULL"))
-    db.session.execute(text("UPDATE bili_bindings SET notify_video=1 WHERE notify_video IS NULL"))
-    db.session.execute(
-        text("UPDATE bili_bindings SET notify_live_start=1 WHERE notify_live_start IS NULL")
-    )
-    db.session.execute(
-        text("UPDATE bili_bindings SET notify_live_hourly=1 WHERE notify_live_hourly IS NULL")
-    )
-    db.session.execute(
-        text("UPDATE bili_bindings SET notify_live_end=1 WHERE notify_live_end IS NULL")
+    # 所有回填合成一条 UPDATE；WHERE 兜底让干净库上这条语句不改任何行。
+    flag_defaults = (
+        "enable_onebot",
+        "notify_dynamic",
+        "notify_video",
+        "notify_live_start",
+        "notify_live_hourly",
+        "notify_live_end",
     )
+    set_parts = [f"{name}=COALESCE({name}, 1)" for name in flag_defaults]
+    where_parts = [f"{name} IS NULL" for name in flag_defaults]
     if "enable_dynamic_screenshot" in existing:
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET enable_screenshot=enable_dynamic_screenshot "
-                "WHERE enable_screenshot IS NULL"
-            )
+        set_parts.append(
+            "enable_screenshot=CASE WHEN enable_screenshot IS NULL "
+            "THEN COALESCE(enable_dynamic_screenshot, 1) ELSE enable_screenshot END"
         )
-    db.session.execute(
-        text("UPDATE bili_bindings SET enable_screenshot=1 WHERE enable_screenshot IS NULL")
-    )
+    else:
+        set_parts.append("enable_screenshot=COALESCE(enable_screenshot, 1)")
+    where_parts.append("enable_screenshot IS NULL")
+    params = {}
     if "template_dynamic" in existing:
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET template_dynamic=:val "
-                "WHERE template_dynamic IS NULL OR template_dynamic=''"
-            ),
-            {"val": DEFAULT_TEMPLATES["dynamic"]},
-        )
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET template_video=:val "
-                "WHERE template_video IS NULL OR template_video=''"
-            ),
-            {"val": DEFAULT_TEMPLATES["video"]},
-        )
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET template_live_start=:val "
-                "WHERE template_live_start IS NULL OR template_live_start=''"
-            ),
-            {"val": DEFAULT_TEMPLATES["live_start"]},
-        )
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET template_live_hourly=:val "
-                "WHERE template_live_hourly IS NULL OR template_live_hourly=''"
-            ),
-            {"val": DEFAULT_TEMPLATES["live_hourly"]},
-        )
-        db.session.execute(
-            text(
-                "UPDATE bili_bindings SET template_live_end=:val "
-                "WHERE template_live_end IS NULL OR template_live_end=''"
-            ),
-            {"val": DEFAULT_TEMPLATES["live_end"]},
-        )
-    default_live_minutes = max(30, get_live_hourly_interval_minutes())
+        for key in ("dynamic", "video", "live_start", "live_hourly", "live_end"):
+            column = f"template_{key}"
+            set_parts.append(
+                f"{column}=CASE WHEN {column} IS NULL OR {column}='' "
+                f"THEN :{column} ELSE {column} END"
+            )
+            where_parts.append(f"{column} IS NULL")
+            where_parts.append(f"{column}=''")
+            params[column] = DEFAULT_TEMPLATES[key]
+    params["default_live_minutes"] = max(30, get_live_hourly_interval_minutes())
+    set_parts.append(
+        "live_hourly_interval=CASE "
+        "WHEN live_hourly_interval IS NULL OR live_hourly_interval=0 "
+        "THEN :default_live_minutes "
+        "WHEN live_hourly_interval < 30 THEN 30 "
+        "ELSE live_hourly_interval END"
+    )
+    where_parts.append("live_hourly_interval IS NULL")
+    where_parts.append("live_hourly_interval < 30")
     db.session.execute(
         text(
-            "UPDATE bili_bindings SET live_hourly_interval=:val "
-            "WHERE live_hourly_interval IS NULL OR live_hourly_interval=0"
+            "UPDATE bili_bindings SET "
+            + ", ".join(set_parts)
+            + " WHERE "
+            + " OR ".join(where_parts)
         ),
-        {"val": default_live_minutes},
+        params,
     )
+    # 旧库补建组合索引；create_all 对已存在的表不会加索引。
     db.session.execute(
-        text("UPDATE bili_bindings SET live_hourly_interval=30 WHERE live_hourly_interval < 30")
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_binding_user_profile "
+            "ON bili_bindings (user_id, onebot_profile_id)"
+        )
     )
     db.session.commit()
 
 
+def _ensure_log_indexes(app: Flask):
+    # 老的 logs 库补模型里声明的过滤索引；create_all 不会动已存在的表。
+    try:
+        engine = db.get_engine(app, bind="logs")
+    except Exception:
+        return
+    statements = (
+        "CREATE INDEX IF NOT EXISTS ix_bili_logs_level_id ON bili_logs (level, id)",
+        "CREATE INDEX IF NOT EXISTS ix_bili_logs_uid_id ON bili_logs (uid, id)",
+        "CREATE INDEX IF NOT EXISTS ix_bili_logs_logger ON bili_logs (logger)",
+    )
+    try:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    except Exception:
+        logging.getLogger(__name__).exception("Failed to ensure log indexes")
+
+
 def _ensure_screenshot_template_records():
+    # 模板库在独立 bind，没法跨库 JOIN；两条 SELECT 做差集，只补缺失的绑定。
     try:
-        bindings = BiliBinding.query.all()
-        for binding in bindings:
+        existing = {
+            row[0]
+            for row in db.session.execute(select(BiliScreenshotTemplate.binding_id))
+        }
+        rows = db.session.execute(
+            select(
+                BiliBinding.id,
+                BiliBinding.screenshot_template_dynamic,
+                BiliBinding.screenshot_template_live,
+            )
+        )
+        for binding_id, template_dynamic, template_live in rows:
+            if binding_id in existing:
+                continue
             ensure_screenshot_templates(
-                binding.id,
-                binding.screenshot_template_dynamic or "",
-                binding.screenshot_template_live or "",
+                binding_id,
+                template_dynamic or "",
+                template_live or "",
             )
     except Exception:
         return
@@ -43,6 +43,8 @@ DYNAMIC_SCREENSHOT_FULL_PAGE = False
 # HTML 截图模板
 SCREENSHOT_TEMPLATE_PATH = os.path.join(BASE_DIR, "screenshot", "page", "0.html")
 SCREENSHOT_WAIT = 0.3
+# 截图输出格式："jpeg" 体积小编码快，"png" 无损
+SCREENSHOT_FORMAT = "jpeg"
 SCREENSHOT_JPEG_QUALITY = 90
 
 # 日志
@@ -6,6 +6,10 @@ db = SQLAlchemy()
 
 class BiliUser(db.Model):
     __tablename__ = "bili_users"
+    # 命名唯一索引，老库升级时可以用 CREATE UNIQUE INDEX IF NOT EXISTS 补齐。
+    __table_args__ = (
+        db.Index("ix_bili_users_login_username", "login_username", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     uid = db.Column(db.String(32), nullable=False, unique=True)
@@ -23,6 +27,13 @@ class BiliUser(db.Model):
     poll_interval = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    bindings = db.relationship(
+        "BiliBinding",
+        back_populates="user",
+        lazy=True,
+        cascade="all, delete-orphan",
+    )
+
 
 class OneBotProfile(db.Model):
     __tablename__ = "onebot_profiles"
@@ -33,9 +44,14 @@ class OneBotProfile(db.Model):
     access_token = db.Column(db.String(255), nullable=False, default="")
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
+    bindings = db.relationship("BiliBinding", back_populates="onebot_profile", lazy=True)
+
 
 class BiliBinding(db.Model):
     __tablename__ = "bili_bindings"
+    __table_args__ = (
+        db.Index("ix_binding_user_profile", "user_id", "onebot_profile_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("bili_users.id"), nullable=False, index=True)
@@ -70,11 +86,11 @@ class BiliBinding(db.Model):
 
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
-    user = db.relationship(
-        "BiliUser",
-        backref=db.backref("bindings", lazy=True, cascade="all, delete-orphan"),
+    # 取到绑定后几乎总会访问 user/onebot_profile，直接 joined-load 省掉补查。
+    user = db.relationship("BiliUser", back_populates="bindings", lazy="joined")
+    onebot_profile = db.relationship(
+        "OneBotProfile", back_populates="bindings", lazy="joined"
     )
-    onebot_profile = db.relationship("OneBotProfile", backref=db.backref("bindings", lazy=True))
 
 
 class AppSetting(db.Model):
@@ -108,6 +124,11 @@ class BiliRuntimeStatus(db.Model):
 class BiliLogEntry(db.Model):
     __bind_key__ = "logs"
     __tablename__ = "bili_logs"
+    __table_args__ = (
+        db.Index("ix_bili_logs_level_id", "level", "id"),
+        db.Index("ix_bili_logs_uid_id", "uid", "id"),
+        db.Index("ix_bili_logs_logger", "logger"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     time = db.Column(db.String(40), default="")
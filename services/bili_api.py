@@ -1,12 +1,17 @@
+import asyncio
 import json
 import logging
 import re
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache, wraps
 from typing import Any
-from urllib.request import Request, urlopen
 
 from bilibili_api import Credential, request_settings, select_client, sync
 from bilibili_api import user as bili_user
+from curl_cffi import requests as curl_requests
 
 from config import (
     BILIBILI_AC_TIME_VALUE,
@@ -28,6 +33,35 @@ _INITIALIZED = False
 _RETRY_COUNT = 2
 _RETRY_BASE_DELAY = 0.6
 
+# 复用 keep-alive 连接：所有直连请求都打同几台主机，省掉每次 TLS 握手。
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session():
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                kwargs = {}
+                if BILIBILI_PROXY:
+                    kwargs["proxies"] = {
+                        "http": BILIBILI_PROXY,
+                        "https": BILIBILI_PROXY,
+                    }
+                if BILIBILI_IMPERSONATE:
+                    kwargs["impersonate"] = BILIBILI_IMPERSONATE
+                _SESSION = curl_requests.Session(**kwargs)
+    return _SESSION
+
+
+def _http_get(url: str, headers: dict) -> bytes:
+    resp = _get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    if resp.status_code != 200:
+        # 与 urlopen 对 4xx/5xx 抛错的行为保持一致，走统一重试。
+        raise RuntimeError(f"HTTP {resp.status_code} for {url}")
+    return resp.content
+
 
 def _init_client():
     global _INITIALIZED
@@ -50,40 +84,41 @@ def _init_client():
     _INITIALIZED = True
 
 
-def _cookie_value(cookie: str, key: str) -> str:
-    if not cookie:
-        return ""
-    match = re.search(rf"(?:^|;)\s*{re.escape(key)}=([^;]*)", cookie)
-    if not match:
-        return ""
-    return match.group(1)
+_COOKIE_KV_RE = re.compile(r"([^=;\s]+)=([^;]*)")
 
 
-def _resolve_value(primary: str, cookie: str, key: str, fallback: str) -> str:
-    return primary or _cookie_value(cookie, key) or fallback
+def _parse_cookie(cookie: str) -> dict:
+    if not cookie:
+        return {}
+    # One linear scan over the cookie string instead of one regex search per key.
+    return dict(_COOKIE_KV_RE.findall(cookie))
 
 
 def _build_credential(data: dict | None = None) -> Credential:
     data = data or {}
-    cookie = data.get("cookie") or ""
-    sessdata = _resolve_value(
-        data.get("sessdata") or "", cookie, "SESSDATA", BILIBILI_SESSDATA
-    )
-    bili_jct = _resolve_value(
-        data.get("bili_jct") or "", cookie, "bili_jct", BILIBILI_BILI_JCT
+    parsed = _parse_cookie(data.get("cookie") or "")
+    sessdata = data.get("sessdata") or parsed.get("SESSDATA") or BILIBILI_SESSDATA
+    bili_jct = data.get("bili_jct") or parsed.get("bili_jct") or BILIBILI_BILI_JCT
+    buvid3 = data.get("buvid3") or parsed.get("buvid3") or BILIBILI_BUVID3
+    buvid4 = data.get("buvid4") or parsed.get("buvid4") or BILIBILI_BUVID4
+    dedeuserid = (
+        data.get("dedeuserid") or parsed.get("DedeUserID") or BILIBILI_DEDEUSERID
     )
-    buvid3 = _resolve_value(
-        data.get("buvid3") or "", cookie, "buvid3", BILIBILI_BUVID3
+    ac_time_value = (
+        data.get("ac_time_value")
+        or parsed.get("ac_time_value")
+        or BILIBILI_AC_TIME_VALUE
     )
-    buvid4 = _resolve_value(
-        data.get("buvid4") or "", cookie, "buvid4", BILIBILI_BUVID4
-    )
-    dedeuserid = _resolve_value(
-        data.get("dedeuserid") or "", cookie, "DedeUserID", BILIBILI_DEDEUSERID
-    )
-    ac_time_value = _resolve_value(
-        data.get("ac_time_value") or "", cookie, "ac_time_value", BILIBILI_AC_TIME_VALUE
+    return _credential_cached(
+        sessdata, bili_jct, buvid3, buvid4, dedeuserid, ac_time_value
     )
+
+
+@lru_cache(maxsize=256)
+def _credential_cached(
+    sessdata, bili_jct, buvid3, buvid4, dedeuserid, ac_time_value
+) -> Credential:
+    # 凭据字段轮询周期内不变，Credential 纯粹是数据载体，按指纹复用。
     return Credential(
         sessdata=sessdata or None,
         bili_jct=bili_jct or None,
@@ -105,6 +140,84 @@ def _headers() -> dict:
     return headers
 
 
+# 同参并发调用共享一次网络往返：首个调用者真正发请求，其余等它的 Future。
+_INFLIGHT: dict = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _freeze_arg(value):
+    # dict 参数（凭据）折叠成可哈希指纹；换了凭据就不会命中旧缓存，
+    # 凭据校验等场景拿到的是用当前凭据发出的结果。
+    if isinstance(value, dict):
+        return tuple(sorted((k, str(v)) for k, v in value.items()))
+    return str(value)
+
+
+def _call_key(fn_name: str, args: tuple, kwargs: dict) -> tuple:
+    return (
+        fn_name,
+        tuple(_freeze_arg(a) for a in args),
+        tuple((k, _freeze_arg(v)) for k, v in kwargs.items()),
+    )
+
+
+def _coalesce_inflight(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = _call_key(fn.__name__, args, kwargs)
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                _INFLIGHT[key] = future
+        if not owner:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _INFLIGHT_LOCK:
+                _INFLIGHT.pop(key, None)
+
+    return wrapper
+
+
+def _ttl_cache(seconds: float):
+    """短 TTL 结果缓存：资料/房间信息分钟级才变，轮询不必每次都打上游。
+
+    key 的构造与 _coalesce_inflight 相同；空结果不缓存，留给下次重试。
+    条目数天然受用户/房间数约束，不另设淘汰。
+    """
+
+    def decorator(fn):
+        cache: dict = {}
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = _call_key(fn.__name__, args, kwargs)
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+                if hit and now < hit[0]:
+                    return hit[1]
+            result = fn(*args, **kwargs)
+            if result:
+                with lock:
+                    cache[key] = (now + seconds, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
 def _retry_sleep(attempt: int):
     delay = _RETRY_BASE_DELAY * (2**attempt)
     time.sleep(delay)
@@ -166,8 +279,13 @@ def _build_cookie_header(data: dict | None) -> str:
 
 
 def _headers_with_credential(data: dict | None) -> dict:
+    return _headers_with_cookie_cached(_build_cookie_header(data))
+
+
+@lru_cache(maxsize=256)
+def _headers_with_cookie_cached(cookie: str) -> dict:
+    # 返回的是共享 dict，调用方只读；要改头先 dict() 复制。
     headers = _headers()
-    cookie = _build_cookie_header(data)
     if cookie:
         headers["Cookie"] = cookie
     return headers
@@ -175,9 +293,7 @@ def _headers_with_credential(data: dict | None) -> dict:
 
 def _fetch_json(url: str, headers: dict) -> dict | None:
     def _call():
-        req = Request(url, headers=headers)
-        with urlopen(req, timeout=HTTP_TIMEOUT) as resp:
-            raw = resp.read()
+        raw = _http_get(url, headers)
         data = json.loads(raw.decode("utf-8", errors="ignore"))
         if isinstance(data, dict):
             return data
@@ -186,6 +302,8 @@ def _fetch_json(url: str, headers: dict) -> dict | None:
     return _call_with_retries(_call, "Bili API json fetch", extra=url)
 
 
+@_ttl_cache(30)
+@_coalesce_inflight
 def fetch_user_info(uid: str, credential_data: dict | None = None) -> dict | None:
     _init_client()
     _LOGGER.debug("Bili API user info uid=%s", uid, extra={"uid": uid})
@@ -197,6 +315,7 @@ def fetch_user_info(uid: str, credential_data: dict | None = None) -> dict | Non
     return _call_with_retries(_call, "Bili API user info", uid=uid)
 
 
+@_coalesce_inflight
 def fetch_live_info(uid: str, credential_data: dict | None = None) -> dict | None:
     _init_client()
     _LOGGER.debug("Bili API live info uid=%s", uid, extra={"uid": uid})
@@ -208,6 +327,8 @@ def fetch_live_info(uid: str, credential_data: dict | None = None) -> dict | Non
     return _call_with_retries(_call, "Bili API live info", uid=uid)
 
 
+@_ttl_cache(30)
+@_coalesce_inflight
 def fetch_live_room_info(
     uid: str, room_id: str | int | None = None, credential_data: dict | None = None
 ) -> dict | None:
@@ -265,6 +386,7 @@ def fetch_live_room_cover(
     return ""
 
 
+@_coalesce_inflight
 def fetch_dynamic_list(
     uid: str, offset: str | None = None, credential_data: dict | None = None
 ) -> list[dict[str, Any]] | None:
@@ -280,6 +402,10 @@ def fetch_dynamic_list(
         return sync(user.get_dynamics_new())
 
     data = _call_with_retries(_call, "Bili API dynamics", uid=uid, extra=offset or "-")
+    return _extract_dynamic_items(data, uid)
+
+
+def _extract_dynamic_items(data, uid: str) -> list[dict[str, Any]] | None:
     if not isinstance(data, dict):
         return None
     items = data.get("items")
@@ -287,7 +413,12 @@ def fetch_dynamic_list(
         items = (data.get("data") or {}).get("items")
     if not isinstance(items, list):
         return None
-    filtered = [item for item in items if not _is_pinned_dynamic(item)]
+    # 置顶动态只会出现在列表开头，靠后的条目不用再逐个检查。
+    filtered = [
+        item
+        for i, item in enumerate(items)
+        if i >= _MAX_PIN_SCAN or not _is_pinned_dynamic(item)
+    ]
     _LOGGER.debug(
         "Bili API dynamics uid=%s total=%s filtered=%s",
         uid,
@@ -298,33 +429,78 @@ def fetch_dynamic_list(
     return filtered
 
 
+@_coalesce_inflight
+def fetch_dynamic_and_live(
+    uid: str, credential_data: dict | None = None
+) -> tuple[list[dict[str, Any]] | None, dict | None]:
+    """一次事件循环里并发拉动态列表和直播信息。
+
+    轮询里这两项总是连着查，gather 让两个 RTT 重叠，也省掉一次
+    事件循环创建；单项失败不拖累另一项。
+    """
+    _init_client()
+    _LOGGER.debug("Bili API dynamic+live uid=%s", uid, extra={"uid": uid})
+
+    async def _gather():
+        user = bili_user.User(int(uid), credential=_build_credential(credential_data))
+        return await asyncio.gather(
+            user.get_dynamics_new(), user.get_live_info(), return_exceptions=True
+        )
+
+    result = _call_with_retries(
+        lambda: sync(_gather()), "Bili API dynamic+live", uid=uid
+    )
+    if not result:
+        return None, None
+    dyn_data, live_info = result
+    if isinstance(dyn_data, BaseException):
+        _LOGGER.warning("Bili API dynamics failed uid=%s err=%s", uid, dyn_data)
+        dyn_data = None
+    if isinstance(live_info, BaseException):
+        _LOGGER.warning("Bili API live info failed uid=%s err=%s", uid, live_info)
+        live_info = None
+    items = _extract_dynamic_items(dyn_data, uid)
+    return items, live_info if isinstance(live_info, dict) else None
+
+
+# 只在返回列表的前几条里找置顶标记
+_MAX_PIN_SCAN = 5
+
+_PIN_FLAG_KEYS = ("is_top", "is_pinned", "is_fixed")
+_PIN_TEXT_KEYS = ("text", "title", "tag_text", "label", "desc")
+_PIN_MODULE_KEYS = ("module_tag", "module_top", "module_anchor", "module_author")
+
+
 def _is_pinned_dynamic(item: dict | None) -> bool:
-    if not isinstance(item, dict):
+    if type(item) is not dict:
         return False
-    if item.get("is_top") or item.get("is_pinned") or item.get("is_fixed"):
+    get = item.get
+    if any(get(k) for k in _PIN_FLAG_KEYS):
         return True
-    modules = item.get("modules")
-    if not isinstance(modules, dict):
+    modules = get("modules")
+    if type(modules) is not dict:
         return False
-    for key in ("module_tag", "module_top", "module_anchor", "module_author"):
+    for key in _PIN_MODULE_KEYS:
         mod = modules.get(key)
-        if isinstance(mod, dict):
-            if mod.get("is_top") or mod.get("is_pinned") or mod.get("is_fixed"):
+        t = type(mod)
+        if t is dict:
+            mget = mod.get
+            if any(mget(k) for k in _PIN_FLAG_KEYS):
                 return True
-            text = mod.get("text") or mod.get("title") or mod.get("tag_text") or ""
-            label = mod.get("label") or mod.get("desc") or ""
-            if "置顶" in str(text) or "置顶" in str(label):
+            # 只对本来就是字符串的字段做子串匹配，省掉 str() 分配。
+            if any("置顶" in value for k in _PIN_TEXT_KEYS if type(value := mget(k)) is str):
                 return True
-        elif isinstance(mod, list):
+        elif t is list:
             for entry in mod:
-                if not isinstance(entry, dict):
+                if type(entry) is not dict:
                     continue
-                text = entry.get("text") or entry.get("title") or ""
-                if "置顶" in str(text):
+                text = entry.get("text") or entry.get("title")
+                if type(text) is str and "置顶" in text:
                     return True
     return False
 
 
+@_coalesce_inflight
 def fetch_latest_video(uid: str, credential_data: dict | None = None) -> dict | None:
     _init_client()
     def _call():
@@ -338,14 +514,55 @@ def fetch_latest_video(uid: str, credential_data: dict | None = None) -> dict |
     return vlist[0]
 
 
+# 头像/封面会被反复下载；记住 ETag 发条件请求，CDN 返回 304 就不传正文。
+_IMG_CACHE: OrderedDict[str, tuple[str, float, bytes]] = OrderedDict()
+_IMG_CACHE_LOCK = threading.Lock()
+_IMG_CACHE_SIZE = 256
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _store_image(url: str, etag: str, resp_headers, content: bytes):
+    fresh_until = 0.0
+    try:
+        match = _MAX_AGE_RE.search(resp_headers.get("cache-control") or "")
+        if match:
+            fresh_until = time.monotonic() + int(match.group(1))
+    except Exception:
+        pass
+    with _IMG_CACHE_LOCK:
+        _IMG_CACHE[url] = (etag, fresh_until, content)
+        _IMG_CACHE.move_to_end(url)
+        while len(_IMG_CACHE) > _IMG_CACHE_SIZE:
+            _IMG_CACHE.popitem(last=False)
+
+
+@_coalesce_inflight
 def download_image(url: str) -> bytes | None:
     if not url:
         return None
     if url.startswith("//"):
         url = "https:" + url
+    with _IMG_CACHE_LOCK:
+        cached = _IMG_CACHE.get(url)
+        if cached is not None:
+            _IMG_CACHE.move_to_end(url)
+            if time.monotonic() < cached[1]:
+                # Cache-Control 还没过期，连条件请求都省了。
+                return cached[2]
+
     def _call():
-        req = Request(url, headers=_headers())
-        with urlopen(req, timeout=HTTP_TIMEOUT) as resp:
-            return resp.read()
+        headers = _headers()
+        if cached is not None and cached[0]:
+            headers = dict(headers)
+            headers["If-None-Match"] = cached[0]
+        resp = _get_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if resp.status_code == 304 and cached is not None:
+            _store_image(url, cached[0], resp.headers, cached[2])
+            return cached[2]
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code} for {url}")
+        content = resp.content
+        _store_image(url, resp.headers.get("etag") or "", resp.headers, content)
+        return content
 
     return _call_with_retries(_call, "Bili image fetch", extra=url)
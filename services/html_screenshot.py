@@ -1,144 +1,272 @@
+import atexit
+import binascii
+import html as html_lib
 import logging
 import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
+import config
 from config import SCREENSHOT_TEMPLATE_PATH, SCREENSHOT_WAIT
 
+# 新增的可选配置项：老的 config.py 里可能还没有，缺省走默认值。
+SCREENSHOT_FORMAT = getattr(config, "SCREENSHOT_FORMAT", "jpeg")
+SCREENSHOT_JPEG_QUALITY = getattr(config, "SCREENSHOT_JPEG_QUALITY", 90)
+
 _LOGGER = logging.getLogger("html_screenshot")
 
+# JPEG 编码比 PNG 快得多、体积也小，卡片截图基本看不出差别。
+_SHOT_KWARGS = {"type": SCREENSHOT_FORMAT if SCREENSHOT_FORMAT in ("png", "jpeg") else "jpeg"}
+if _SHOT_KWARGS["type"] == "jpeg":
+    _SHOT_KWARGS["quality"] = int(SCREENSHOT_JPEG_QUALITY)
+
+# Chromium 冷启动要 0.5~2s，占整个渲染的大头；浏览器进程和渲染页面
+# 都常驻，每次渲染只 set_content 替换文档。sync API 的对象绑定创建
+# 线程，所以所有 Playwright 调用都收口到这个单工作线程上执行。
+_RENDER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="html-shot")
+_PLAYWRIGHT = None
+_BROWSER = None
+# 每隔这么多次渲染重启一次浏览器，防止 Chromium 原生内存慢慢涨上去。
+_BROWSER_MAX_USES = 100
+_BROWSER_USES = 0
+# 常驻的渲染页面；set_content 每次整体替换文档，跨渲染不会串状态。
+_CONTEXT = None
+_PAGE = None
+
+
+def _get_browser():
+    # 只在渲染工作线程里调用。
+    global _PLAYWRIGHT, _BROWSER, _BROWSER_USES
+    from playwright.sync_api import sync_playwright
+
+    if _BROWSER is not None:
+        _BROWSER_USES += 1
+        if _BROWSER.is_connected() and _BROWSER_USES <= _BROWSER_MAX_USES:
+            return _BROWSER
+        try:
+            _BROWSER.close()
+        except Exception:
+            pass
+        _BROWSER = None
+    _BROWSER_USES = 1
+    if _PLAYWRIGHT is None:
+        _PLAYWRIGHT = sync_playwright().start()
+    # 模板里的字体/CSS/图片走 Chromium 磁盘缓存，跨渲染复用。
+    cache_dir = os.path.join(tempfile.gettempdir(), "bili_shot_cache")
+    _BROWSER = _PLAYWRIGHT.chromium.launch(
+        headless=True,
+        args=[
+            "--disable-dev-shm-usage",
+            "--no-sandbox",
+            "--disable-gpu",
+            "--disable-background-timer-throttling",
+            "--disable-renderer-backgrounding",
+            f"--disk-cache-dir={cache_dir}",
+            "--disk-cache-size=104857600",
+        ],
+    )
+    return _BROWSER
+
+
+def _get_page():
+    # 只在渲染工作线程里调用。浏览器被回收时页面会一并关闭，
+    # is_closed() 检查让这里自动重建。
+    global _BROWSER, _CONTEXT, _PAGE
+    browser = _get_browser()
+    if _PAGE is not None and not _PAGE.is_closed():
+        return _PAGE
+    _CONTEXT = None
+    _PAGE = None
+    # 视口给高一点，普通卡片量完尺寸后不用再改视口触发整页重排；
+    # Playwright 的 clip 本身支持超出视口截图。
+    viewport = {"width": 1280, "height": 2000}
+    try:
+        _CONTEXT = browser.new_context(viewport=viewport)
+    except Exception:
+        # 浏览器进程挂了就重启一次再试。
+        _BROWSER = None
+        browser = _get_browser()
+        _CONTEXT = browser.new_context(viewport=viewport)
+    _PAGE = _CONTEXT.new_page()
+    _PAGE.set_default_timeout(15000)
+    _PAGE.set_default_navigation_timeout(15000)
+    template_path = SCREENSHOT_TEMPLATE_PATH
+    if template_path and os.path.exists(template_path):
+        _PAGE.goto(f"file://{template_path}")
+    return _PAGE
+
+
+def _drop_page():
+    global _CONTEXT, _PAGE
+    if _PAGE is not None:
+        try:
+            _PAGE.close()
+        except Exception:
+            pass
+        _PAGE = None
+    if _CONTEXT is not None:
+        try:
+            _CONTEXT.close()
+        except Exception:
+            pass
+        _CONTEXT = None
+
+
+def _shutdown_browser():
+    def _close():
+        global _PLAYWRIGHT, _BROWSER
+        _drop_page()
+        if _BROWSER is not None:
+            try:
+                _BROWSER.close()
+            except Exception:
+                pass
+            _BROWSER = None
+        if _PLAYWRIGHT is not None:
+            try:
+                _PLAYWRIGHT.stop()
+            except Exception:
+                pass
+            _PLAYWRIGHT = None
+
+    try:
+        _RENDER_POOL.submit(_close).result(timeout=10)
+    except Exception:
+        pass
+
+
+atexit.register(_shutdown_browser)
+
+
+# 远程图片预下载后内联成 data URI，渲染时浏览器不用自己发起 TLS 请求。
+_IMG_SRC_RE = re.compile(r'src="((?:https?:)?//[^"]+)"')
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="img-prefetch")
+
+_MIME_BY_EXT = {
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+def _inline_images(html: str) -> str:
+    # src 属性值是转义过的（& 变成 &amp;），下载前要还原，
+    # 回填替换时仍用转义形式去匹配原文。
+    urls = list(dict.fromkeys(_IMG_SRC_RE.findall(html)))
+    if not urls:
+        return html
+    from services.bili_api import download_image
+
+    raw_urls = [html_lib.unescape(url) for url in urls]
+    try:
+        results = list(_PREFETCH_POOL.map(download_image, raw_urls, timeout=20))
+    except Exception:
+        return html
+    for url, raw_url, data in zip(urls, raw_urls, results):
+        if not data:
+            continue
+        ext = os.path.splitext(raw_url.split("?", 1)[0])[1].lower()
+        mime = _MIME_BY_EXT.get(ext, "image/jpeg")
+        encoded = binascii.b2a_base64(data, newline=False).decode("ascii")
+        html = html.replace(f'src="{url}"', f'src="data:{mime};base64,{encoded}"')
+    return html
+
+
+# 催促图片 eager 解码 + 等字体/图片就绪，合成一次 evaluate 往返；
+# 脚本源码逐字节相同，V8 还能命中编译缓存。
+_READY_SCRIPT = """async () => {
+    const imgs = Array.from(document.images || []);
+    for (const img of imgs) {
+      img.loading = "eager";
+      img.decoding = "sync";
+    }
+    const fontReady = document.fonts && document.fonts.ready ? document.fonts.ready : null;
+    if (fontReady) {
+      try { await fontReady; } catch (e) {}
+    }
+    const waitForImg = (img) => new Promise((resolve) => {
+      if (img.complete) return resolve();
+      const done = () => resolve();
+      img.addEventListener("load", done, { once: true });
+      img.addEventListener("error", done, { once: true });
+    });
+    await Promise.race([
+      Promise.all(imgs.map(waitForImg)),
+      new Promise((resolve) => setTimeout(resolve, 3000))
+    ]);
+    const target = document.querySelector(".card, #capture-root, body > *");
+    const rect = target ? target.getBoundingClientRect() : null;
+    const doc = document.documentElement;
+    const body = document.body;
+    return {
+      x: rect ? rect.x : 0,
+      y: rect ? rect.y : 0,
+      width: rect ? rect.width : 0,
+      height: rect ? rect.height : 0,
+      docWidth: Math.max(body ? body.scrollWidth : 0, doc.scrollWidth, doc.clientWidth),
+      docHeight: Math.max(body ? body.scrollHeight : 0, doc.scrollHeight, doc.clientHeight)
+    };
+}"""
+
 
 def render_html_to_image(html: str) -> bytes | None:
     if not html:
         return None
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright.sync_api  # noqa: F401
     except Exception as exc:
         _LOGGER.info("Playwright not available: %s", exc)
         return None
+    html = _inline_images(html)
+    return _RENDER_POOL.submit(_render_on_worker, html).result()
 
-    template_path = SCREENSHOT_TEMPLATE_PATH
-    if template_path and not os.path.exists(template_path):
-        template_path = None
 
-    with sync_playwright() as p:
-        browser = None
-        context = None
-        page = None
+def _render_on_worker(html: str) -> bytes | None:
+    try:
+        page = _get_page()
+        # networkidle 要等 500ms 静默窗口，下面的 evaluate 已经显式等
+        # 字体和图片加载完，domcontentloaded 就够了。
+        page.set_content(html, wait_until="domcontentloaded")
+        metrics = None
         try:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={"width": 1280, "height": 720})
-            page = context.new_page()
-            # Bound per-operation waits to reduce long-hanging renderer tasks.
-            page.set_default_timeout(15000)
-            page.set_default_navigation_timeout(15000)
-
-            if template_path:
-                page.goto(f"file://{template_path}")
-            page.set_content(html, wait_until="load")
-            page.wait_for_load_state("networkidle")
-            if SCREENSHOT_WAIT:
-                page.wait_for_timeout(int(SCREENSHOT_WAIT * 1000))
-            try:
-                page.evaluate(
-                    """() => {
-                    const imgs = Array.from(document.images || []);
-                    for (const img of imgs) {
-                      img.loading = "eager";
-                      img.decoding = "sync";
-                    }
-                }"""
-                )
-                page.evaluate(
-                    """async () => {
-                    const fontReady = document.fonts && document.fonts.ready ? document.fonts.ready : null;
-                    if (fontReady) {
-                      try { await fontReady; } catch (e) {}
-                    }
-                    const imgs = Array.from(document.images || []);
-                    const waitForImg = (img) => new Promise((resolve) => {
-                      if (img.complete) return resolve();
-                      const done = () => resolve();
-                      img.addEventListener("load", done, { once: true });
-                      img.addEventListener("error", done, { once: true });
-                    });
-                    await Promise.race([
-                      Promise.all(imgs.map(waitForImg)),
-                      new Promise((resolve) => setTimeout(resolve, 3000))
-                    ]);
-                }"""
-                )
-            except Exception:
-                pass
+            metrics = page.evaluate(_READY_SCRIPT)
+        except Exception:
+            pass
+        if SCREENSHOT_WAIT:
+            page.wait_for_timeout(int(SCREENSHOT_WAIT * 1000))
 
-            target = page.locator(".card, #capture-root, body > *").first
-            box = None
-            try:
-                if target and target.count() > 0:
-                    box = target.bounding_box()
-            except Exception:
-                box = None
-            if box and box.get("width") and box.get("height"):
-                clip_width = max(1, int(box["x"] + box["width"]))
-                clip_height = max(1, int(box["y"] + box["height"]))
-                try:
-                    page.set_viewport_size({"width": clip_width, "height": clip_height})
-                except Exception:
-                    pass
+        if isinstance(metrics, dict):
+            if metrics.get("width") and metrics.get("height"):
                 clip = {
-                    "x": box["x"],
-                    "y": box["y"],
-                    "width": box["width"],
-                    "height": box["height"],
+                    "x": metrics["x"],
+                    "y": metrics["y"],
+                    "width": metrics["width"],
+                    "height": metrics["height"],
                 }
-                return page.screenshot(type="png", clip=clip)
-
-            dims = page.evaluate(
-                """() => {
-                const doc = document.documentElement;
-                const body = document.body;
-                const width = Math.max(body ? body.scrollWidth : 0, doc.scrollWidth, doc.clientWidth);
-                const height = Math.max(body ? body.scrollHeight : 0, doc.scrollHeight, doc.clientHeight);
-                return { width, height };
-            }"""
-            )
-            if isinstance(dims, dict) and dims.get("width") and dims.get("height"):
-                clip_width = max(1, int(dims["width"]))
-                clip_height = max(1, int(dims["height"]))
-                try:
-                    page.set_viewport_size({"width": clip_width, "height": clip_height})
-                except Exception:
-                    pass
+                return page.screenshot(clip=clip, **_SHOT_KWARGS)
+            if metrics.get("docWidth") and metrics.get("docHeight"):
                 clip = {
                     "x": 0,
                     "y": 0,
-                    "width": clip_width,
-                    "height": clip_height,
+                    "width": max(1, int(metrics["docWidth"])),
+                    "height": max(1, int(metrics["docHeight"])),
                 }
-                return page.screenshot(type="png", clip=clip)
+                return page.screenshot(clip=clip, **_SHOT_KWARGS)
 
-            element = page.locator("html")
-            box = element.bounding_box()
-            if box:
-                clip = {
-                    "x": box["x"],
-                    "y": box["y"],
-                    "width": box["width"],
-                    "height": box["height"],
-                }
-                return page.screenshot(type="png", clip=clip)
-            return page.screenshot(type="png", full_page=True)
-        finally:
-            if page is not None:
-                try:
-                    page.close()
-                except Exception:
-                    pass
-            if context is not None:
-                try:
-                    context.close()
-                except Exception:
-                    pass
-            if browser is not None:
-                try:
-                    browser.close()
-                except Exception:
-                    pass
+        # evaluate 失败时的兜底测量
+        element = page.locator("html")
+        box = element.bounding_box()
+        if box:
+            clip = {
+                "x": box["x"],
+                "y": box["y"],
+                "width": box["width"],
+                "height": box["height"],
+            }
+            return page.screenshot(clip=clip, **_SHOT_KWARGS)
+        return page.screenshot(full_page=True, **_SHOT_KWARGS)
+    except Exception:
+        # 出错后页面状态不可信，丢掉让下一次渲染重建。
+        _drop_page()
+        raise
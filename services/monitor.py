@@ -1,4 +1,4 @@
-import base64
+import binascii
 import html as html_lib
 import logging
 import queue
@@ -6,6 +6,7 @@ import re
 import threading
 import time
 from datetime import datetime
+from functools import lru_cache
 
 from config import (
     DYNAMIC_SCREENSHOT_FULL_PAGE,
@@ -13,9 +14,10 @@ from config import (
     MAX_DYNAMIC_PER_POLL,
     POLL_INTERVAL,
 )
-from models import BiliUser
+from models import BiliUser, db
 from services.bili_api import (
     download_image,
+    fetch_dynamic_and_live,
     fetch_dynamic_list,
     fetch_live_info,
     fetch_live_room_info,
@@ -29,7 +31,116 @@ from services.screenshot_templates import DEFAULT_HTML_TEMPLATES, render_html_te
 from services.state import update_status
 from services.time_utils import format_duration
 
-_SPECIAL_PATTERN = re.compile(r"(\{SHOTPICTURE\}|\[atALL\])")
+_SPECIAL_TOKENS = ("{SHOTPICTURE}", "[atALL]")
+
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# [截图 bytes, base64 结果]，一批推送内复用同一次编码。
+_IMG_SEG_CACHE: list = [None, ""]
+
+# 模板键 -> 绑定字段名，避免每次调用都拼 f-string。
+_TEMPLATE_ATTRS = {
+    key: f"template_{key}"
+    for key in ("dynamic", "video", "live_start", "live_hourly", "live_end")
+}
+
+
+@lru_cache(maxsize=256)
+def _split_special(template: str) -> tuple[str, ...]:
+    # Fixed-literal scan; a substring gate plus str.find beats the regex
+    # alternation on every rendered message. 模板集合有限，切分结果缓存复用。
+    if "{SHOTPICTURE}" not in template and "[atALL]" not in template:
+        return (template,)
+    parts = []
+    rest = template
+    while rest:
+        idx = -1
+        token = ""
+        for candidate in _SPECIAL_TOKENS:
+            pos = rest.find(candidate)
+            if pos != -1 and (idx == -1 or pos < idx):
+                idx = pos
+                token = candidate
+        if idx == -1:
+            parts.append(rest)
+            break
+        if idx:
+            parts.append(rest[:idx])
+        parts.append(token)
+        rest = rest[idx + len(token):]
+    return tuple(parts)
+
+
+# 每条：major 里的候选键 -> (标题键, 描述键, 链接键, 封面键)，按声明顺序取第一个非空值。
+_EXTRA_CARD_SPECS = (
+    (("common",), ("title", "name"), ("desc", "summary"), ("jump_url", "url"), ("cover",)),
+    (("article",), ("title",), ("desc", "summary"), ("jump_url", "url"), ("cover",)),
+    (("archive",), ("title",), ("desc", "desc_text"), ("jump_url", "url"), ("cover",)),
+    (
+        ("live_rcmd", "live"),
+        ("title", "roomname"),
+        ("desc", "intro"),
+        ("link", "url"),
+        ("cover", "keyframe"),
+    ),
+    (
+        ("reserve",),
+        ("title",),
+        ("desc", "desc1", "desc2"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+    (("opus",), ("title",), ("summary", "content"), ("jump_url", "url"), ("cover",)),
+    (
+        ("topic",),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+    (
+        ("medialist", "collection", "fav"),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+    (
+        ("activity", "mission", "courses"),
+        ("title", "name"),
+        ("desc", "summary"),
+        ("jump_url", "url"),
+        ("cover", "image"),
+    ),
+)
+
+
+def _first_value(node: dict, keys: tuple) -> str:
+    for key in keys:
+        value = node.get(key)
+        if value:
+            return value
+    return ""
+
+
+# 常见备选键位，按声明顺序取第一个非空值，替代层层 .get() or 链。
+_AVATAR_KEYS = ("face", "avatar")
+_RICH_NODE_KEYS = ("rich_text_nodes", "nodes")
+_TEXT_CONTENT_KEYS = ("text", "content", "summary")
+_OPUS_TEXT_KEYS = ("content", "text")
+
+# 媒体卡片的固定 HTML 片段，% 填充比每次重建 f-string 便宜。
+_escape = html_lib.escape
+_IMG_TPL = '<img class="media-img" src="%s" />'
+_COVER_TPL = '<img class="media-cover" src="%s" />'
+_TITLE_TPL = '<div class="media-title">%s</div>'
+_DESC_TPL = '<div class="media-desc">%s</div>'
+_LINK_TPL = '<div class="media-link">%s</div>'
+
+
+def _node_text(nodes) -> str:
+    # 列表推导整体跑在更紧的解释器循环里；type() is 判断同 _stringify。
+    return "".join([node.get("text") or "" for node in nodes if type(node) is dict])
 
 
 class _RateLimiter:
@@ -119,6 +230,11 @@ class BiliMonitor:
         self._onebot_queue = _TaskQueue(
             "onebot", workers=1, min_interval=0.2, maxsize=500, logger=self._logger
         )
+        # 渲染截图可能要好几秒，整条通知派发挪到单独的工作线程，
+        # 轮询线程不被截图卡住；单 worker 保证消息按发现顺序送出。
+        self._dispatch_queue = _TaskQueue(
+            "dispatch", workers=1, min_interval=0.0, maxsize=200, logger=self._logger
+        )
 
         self._last_dynamic_id = {}
         self._last_dynamic_text = {}
@@ -188,7 +304,12 @@ class BiliMonitor:
             global_interval = get_global_poll_interval()
             live_hourly_default = max(30, get_live_hourly_interval_minutes())
             now = time.time()
-            users = BiliUser.query.filter_by(enabled=True).all()
+            # bindings 是懒加载，selectinload 把 N 次每用户查询并成一次。
+            users = (
+                BiliUser.query.options(db.selectinload(BiliUser.bindings))
+                .filter_by(enabled=True)
+                .all()
+            )
             users = [
                 {
                     "id": u.id,
@@ -269,8 +390,12 @@ class BiliMonitor:
                         name = f"UID {uid}"
 
                 self._ensure_user_profile(user, name)
-                self._handle_dynamic(user, name)
-                self._handle_live(user, name)
+                # 动态和直播并发拉取，一个限流槽位搞定两个请求。
+                items, live_info = self._bapi_call(
+                    fetch_dynamic_and_live, uid, credential_data=user.get("credential")
+                ) or (None, None)
+                self._handle_dynamic(user, name, items=items)
+                self._handle_live(user, name, info=live_info)
                 self._update_status_cache(user, name)
             return self._next_sleep_time(now)
 
@@ -304,15 +429,19 @@ class BiliMonitor:
     def _update_user_name(self, user_id: int, name: str):
         try:
             with self.app.app_context():
-                target = BiliUser.query.get(user_id)
+                target = db.session.get(BiliUser, user_id)
                 if target and target.name != name:
                     target.name = name
-                    from models import db
-
                     db.session.commit()
         except Exception:
             self._logger.exception("Failed to update user name")
 
+    def _dispatch_job(self, fn, *args):
+        # dispatch worker 线程自身没有应用上下文，而模板读取等
+        # 操作要走 db.session，这里统一补上。
+        with self.app.app_context():
+            fn(*args)
+
     def _bapi_call(self, fn, *args, **kwargs):
         try:
             return self._bapi_queue.submit(fn, *args, wait=True, **kwargs)
@@ -322,11 +451,12 @@ class BiliMonitor:
             )
             return None
 
-    def _handle_dynamic(self, user: dict, name: str):
+    def _handle_dynamic(self, user: dict, name: str, items: list | None = None):
         uid = user["uid"]
-        items = self._bapi_call(
-            fetch_dynamic_list, uid, credential_data=user.get("credential")
-        )
+        if items is None:
+            items = self._bapi_call(
+                fetch_dynamic_list, uid, credential_data=user.get("credential")
+            )
         if not items:
             return
         self._logger.debug(
@@ -380,7 +510,7 @@ class BiliMonitor:
         for info in new_items:
             if not info.get("avatar"):
                 info["avatar"] = self._user_face.get(uid, "")
-            self._dispatch_dynamic(user, name, info)
+            self._dispatch_queue.submit(self._dispatch_job, self._dispatch_dynamic, user, name, info)
 
         self._last_dynamic_id[uid] = latest_id
         if not latest_info.get("avatar"):
@@ -437,10 +567,11 @@ class BiliMonitor:
                     binding.get("id"),
                 )
 
-    def _handle_live(self, user: dict, name: str):
+    def _handle_live(self, user: dict, name: str, info: dict | None = None):
         uid = user["uid"]
         bindings = user.get("bindings") or []
-        info = self._bapi_call(fetch_live_info, uid, user.get("credential"))
+        if info is None:
+            info = self._bapi_call(fetch_live_info, uid, user.get("credential"))
         live_status = self._extract_live_status(info)
         room_info = None
         if (
@@ -550,7 +681,9 @@ class BiliMonitor:
                 if binding_id is None:
                     continue
                 self._live_last_hourly[(uid, binding_id)] = now
-            self._dispatch_live_event(
+            self._dispatch_queue.submit(
+                self._dispatch_job,
+                self._dispatch_live_event,
                 user,
                 name,
                 "live_start",
@@ -606,7 +739,9 @@ class BiliMonitor:
                                 start_ts = None
                     duration = now - start_ts if start_ts else 0
                     max_online = self._live_max_online.get(uid, 0)
-                    self._dispatch_live_event(
+                    self._dispatch_queue.submit(
+                        self._dispatch_job,
+                        self._dispatch_live_event,
                         {"uid": uid, "bindings": [binding]},
                         name,
                         "live_hourly",
@@ -624,7 +759,9 @@ class BiliMonitor:
             start_ts = self._live_started_at.get(uid)
             duration = time.time() - start_ts if start_ts else 0
             max_online = self._live_max_online.get(uid, 0)
-            self._dispatch_live_event(
+            self._dispatch_queue.submit(
+                self._dispatch_job,
+                self._dispatch_live_event,
                 user,
                 name,
                 "live_end",
@@ -768,22 +905,39 @@ class BiliMonitor:
         if text:
             self._onebot_queue.submit(self.onebot.send_text, settings, text)
 
-    def _build_segments(self, template: str, values: dict, image_bytes: bytes | None):
-        parts = _SPECIAL_PATTERN.split(template)
+    # 特殊标记 -> 段构造器；新增标记只需在这里登记，不用改 _build_segments 循环。
+    _SEG_BUILDERS = {
+        "{SHOTPICTURE}": lambda self, image_bytes: (
+            self._image_segment(image_bytes) if image_bytes else None
+        ),
+        "[atALL]": lambda self, image_bytes: {"type": "at", "data": {"qq": "all"}},
+    }
+
+    def _build_segments(
+        self,
+        template: str,
+        values: dict,
+        image_bytes: bytes | None,
+        _split=_split_special,
+        _builders=_SEG_BUILDERS,
+    ):
+        parts = _split(template)
+        # 统一字符串化一次，后面每个片段替换时不再逐值 str()。
+        values = {
+            key: "" if value is None else str(value) for key, value in values.items()
+        }
         segments = []
         rich = False
         for part in parts:
             if not part:
                 continue
-            if part == "{SHOTPICTURE}":
-                if image_bytes:
-                    segments.append(self._image_segment(image_bytes))
+            builder = _builders.get(part)
+            if builder is not None:
+                seg = builder(self, image_bytes)
+                if seg is not None:
+                    segments.append(seg)
                     rich = True
                 continue
-            if part == "[atALL]":
-                segments.append({"type": "at", "data": {"qq": "all"}})
-                rich = True
-                continue
 
             text = self._apply_values(part, values)
             if text:
@@ -794,19 +948,30 @@ class BiliMonitor:
             rich = True
         return segments, rich
 
-    def _apply_values(self, text: str, values: dict) -> str:
-        if not text:
-            return ""
-        for key, value in values.items():
-            text = text.replace(f"{{{key}}}", "" if value is None else str(value))
-        return text
+    def _apply_values(self, text: str, values: dict, _resub=_PLACEHOLDER_RE.sub) -> str:
+        # 单次线性扫描替换全部占位符；未知占位符与孤立大括号保持原样。
+        if not text or "{" not in text:
+            return text or ""
+
+        def _sub(match):
+            key = match.group(1)
+            if key in values:
+                value = values[key]
+                return "" if value is None else str(value)
+            return match.group(0)
+
+        return _resub(_sub, text)
 
     def _image_segment(self, image_bytes: bytes) -> dict:
-        image_b64 = base64.b64encode(image_bytes).decode("ascii")
-        return {"type": "image", "data": {"file": f"base64://{image_b64}"}}
+        # 同一张截图会推给多个绑定，单槽缓存让 base64 只编码一次。
+        cache = _IMG_SEG_CACHE
+        if cache[0] is not image_bytes:
+            cache[0] = image_bytes
+            cache[1] = binascii.b2a_base64(image_bytes, newline=False).decode("ascii")
+        return {"type": "image", "data": {"file": f"base64://{cache[1]}"}}
 
     def _get_template(self, binding: dict, key: str) -> str:
-        value = binding.get(f"template_{key}")
+        value = binding.get(_TEMPLATE_ATTRS.get(key, ""))
         if value:
             return value
         return DEFAULT_TEMPLATES.get(key, "")
@@ -1362,7 +1527,7 @@ class BiliMonitor:
     def _extract_author_media(self, author: dict) -> tuple[str, str]:
         avatar = ""
         if isinstance(author, dict):
-            avatar = author.get("face") or author.get("avatar") or ""
+            avatar = _first_value(author, _AVATAR_KEYS)
         return self._normalize_url(str(avatar)) if avatar else "", ""
 
     def _extract_dynamic_media(self, dynamic: dict) -> tuple[list[str], dict]:
@@ -1393,14 +1558,8 @@ class BiliMonitor:
                 )
                 if url:
                     images.append(self._normalize_url(str(url)))
-        cleaned = []
-        seen = set()
-        for url in images:
-            if not url or url in seen:
-                continue
-            seen.add(url)
-            cleaned.append(url)
-        return cleaned
+        # 每条 append 都带非空判断，这里只需按序去重。
+        return list(dict.fromkeys(images))
 
     def _collect_image_urls(self, major: dict) -> list[str]:
         images = []
@@ -1483,135 +1642,59 @@ class BiliMonitor:
             if cover:
                 images.append(self._normalize_url(str(cover)))
 
-        cleaned = []
-        seen = set()
-        for url in images:
-            if not url or url in seen:
-                continue
-            seen.add(url)
-            cleaned.append(url)
-        return cleaned
+        # 每条 append 都带非空判断，这里只需按序去重。
+        return list(dict.fromkeys(images))
 
     def _extract_extra_card(self, major: dict) -> dict:
-        common = major.get("common")
-        if isinstance(common, dict):
-            return {
-                "title": common.get("title") or common.get("name") or "",
-                "desc": common.get("desc") or common.get("summary") or "",
-                "url": self._normalize_url(common.get("jump_url") or common.get("url") or ""),
-                "cover": self._normalize_url(common.get("cover") or ""),
-            }
-        article = major.get("article")
-        if isinstance(article, dict):
-            return {
-                "title": article.get("title") or "",
-                "desc": article.get("desc") or article.get("summary") or "",
-                "url": self._normalize_url(article.get("jump_url") or article.get("url") or ""),
-                "cover": self._normalize_url(article.get("cover") or ""),
-            }
-        archive = major.get("archive")
-        if isinstance(archive, dict):
-            return {
-                "title": archive.get("title") or "",
-                "desc": archive.get("desc") or archive.get("desc_text") or "",
-                "url": self._normalize_url(archive.get("jump_url") or archive.get("url") or ""),
-                "cover": self._normalize_url(archive.get("cover") or ""),
-            }
-        live = major.get("live_rcmd") or major.get("live")
-        if isinstance(live, dict):
-            return {
-                "title": live.get("title") or live.get("roomname") or "",
-                "desc": live.get("desc") or live.get("intro") or "",
-                "url": self._normalize_url(live.get("link") or live.get("url") or ""),
-                "cover": self._normalize_url(live.get("cover") or live.get("keyframe") or ""),
-            }
-        reserve = major.get("reserve")
-        if isinstance(reserve, dict):
-            return {
-                "title": reserve.get("title") or "",
-                "desc": reserve.get("desc") or reserve.get("desc1") or reserve.get("desc2") or "",
-                "url": self._normalize_url(reserve.get("jump_url") or reserve.get("url") or ""),
-                "cover": self._normalize_url(reserve.get("cover") or reserve.get("image") or ""),
-            }
-        opus = major.get("opus")
-        if isinstance(opus, dict):
-            return {
-                "title": opus.get("title") or "",
-                "desc": opus.get("summary") or opus.get("content") or "",
-                "url": self._normalize_url(opus.get("jump_url") or opus.get("url") or ""),
-                "cover": self._normalize_url(opus.get("cover") or ""),
-            }
-        topic = major.get("topic")
-        if isinstance(topic, dict):
-            return {
-                "title": topic.get("title") or topic.get("name") or "",
-                "desc": topic.get("desc") or topic.get("summary") or "",
-                "url": self._normalize_url(topic.get("jump_url") or topic.get("url") or ""),
-                "cover": self._normalize_url(topic.get("cover") or topic.get("image") or ""),
-            }
-        medialist = major.get("medialist") or major.get("collection") or major.get("fav")
-        if isinstance(medialist, dict):
-            return {
-                "title": medialist.get("title") or medialist.get("name") or "",
-                "desc": medialist.get("desc") or medialist.get("summary") or "",
-                "url": self._normalize_url(medialist.get("jump_url") or medialist.get("url") or ""),
-                "cover": self._normalize_url(medialist.get("cover") or medialist.get("image") or ""),
-            }
-        activity = major.get("activity") or major.get("mission") or major.get("courses")
-        if isinstance(activity, dict):
+        for node_keys, title_keys, desc_keys, url_keys, cover_keys in _EXTRA_CARD_SPECS:
+            node = None
+            for key in node_keys:
+                node = major.get(key)
+                if node:
+                    break
+            if not isinstance(node, dict):
+                continue
             return {
-                "title": activity.get("title") or activity.get("name") or "",
-                "desc": activity.get("desc") or activity.get("summary") or "",
-                "url": self._normalize_url(activity.get("jump_url") or activity.get("url") or ""),
-                "cover": self._normalize_url(activity.get("cover") or activity.get("image") or ""),
+                "title": _first_value(node, title_keys),
+                "desc": _first_value(node, desc_keys),
+                "url": self._normalize_url(_first_value(node, url_keys)),
+                "cover": self._normalize_url(_first_value(node, cover_keys)),
             }
         return {}
 
-    def _build_media_html(self, images: list[str], extra: dict) -> str:
-        parts = []
+    # 热路径方法用默认参数把模块级查找固化成 LOAD_FAST（对调用方不可见）。
+    def _build_media_html(self, images: list[str], extra: dict, escape=_escape) -> str:
+        html = ""
         if images:
-            imgs = []
-            seen = set()
-            for url in images:
-                if url in seen:
-                    continue
-                seen.add(url)
-                if len(imgs) >= 9:
-                    break
-                safe_url = html_lib.escape(url, quote=True)
-                imgs.append(f'<img class="media-img" src="{safe_url}" />')
-            parts.append(f'<div class="media-grid">{"".join(imgs)}</div>')
+            imgs = ""
+            # dict.fromkeys 去重保序，九宫格最多取前 9 张。
+            for url in list(dict.fromkeys(images))[:9]:
+                imgs += _IMG_TPL % escape(url, quote=True)
+            html += f'<div class="media-grid">{imgs}</div>'
 
         if isinstance(extra, dict):
-            title = self._stringify(extra.get("title"))
-            desc = self._stringify(extra.get("desc"))
-            url = self._stringify(extra.get("url"))
-            cover = self._stringify(extra.get("cover"))
+            stringify = self._stringify
+            title = stringify(extra.get("title"))
+            desc = stringify(extra.get("desc"))
+            url = stringify(extra.get("url"))
+            cover = stringify(extra.get("cover"))
             if images and cover and not (title or desc or url):
                 cover = ""
             if images and cover and (title or desc or url):
                 cover = ""
             if title or desc or cover or url:
-                card = []
+                card = ""
                 if cover:
-                    card.append(
-                        f'<img class="media-cover" src="{html_lib.escape(cover, quote=True)}" />'
-                    )
+                    card += _COVER_TPL % escape(cover, quote=True)
                 if title:
-                    card.append(
-                        f'<div class="media-title">{html_lib.escape(title)}</div>'
-                    )
+                    card += _TITLE_TPL % escape(title)
                 if desc:
-                    card.append(
-                        f'<div class="media-desc">{html_lib.escape(desc)}</div>'
-                    )
+                    card += _DESC_TPL % escape(desc)
                 if url:
-                    card.append(
-                        f'<div class="media-link">{html_lib.escape(url)}</div>'
-                    )
-                parts.append(f'<div class="media-card">{"".join(card)}</div>')
+                    card += _LINK_TPL % escape(url)
+                html += f'<div class="media-card">{card}</div>'
 
-        return "".join(parts)
+        return html
 
     def _render_dynamic_media(self, dynamic: dict, item: dict | None) -> str:
         if not isinstance(dynamic, dict):
@@ -2031,17 +2114,17 @@ class BiliMonitor:
         for key in ("desc", "comment", "content", "text", "summary"):
             value = module.get(key)
             if isinstance(value, dict):
-                nodes = value.get("rich_text_nodes") or value.get("nodes")
+                nodes = _first_value(value, _RICH_NODE_KEYS)
                 if isinstance(nodes, list):
                     return self._rich_text_nodes_to_html(nodes)
-                text = value.get("text") or value.get("content") or value.get("summary") or ""
+                text = _first_value(value, _TEXT_CONTENT_KEYS)
                 if text:
                     return html_lib.escape(str(text)).replace("\n", "<br>")
             elif isinstance(value, list):
                 return self._rich_text_nodes_to_html(value)
             elif isinstance(value, str):
                 return html_lib.escape(value).replace("\n", "<br>")
-        nodes = module.get("rich_text_nodes") or module.get("nodes")
+        nodes = _first_value(module, _RICH_NODE_KEYS)
         if isinstance(nodes, list):
             return self._rich_text_nodes_to_html(nodes)
         return ""
@@ -2052,25 +2135,19 @@ class BiliMonitor:
         for key in ("desc", "comment", "content", "text", "summary"):
             value = module.get(key)
             if isinstance(value, dict):
-                text = value.get("text") or value.get("content") or value.get("summary") or ""
+                text = _first_value(value, _TEXT_CONTENT_KEYS)
                 if text:
                     return str(text)
-                nodes = value.get("rich_text_nodes") or value.get("nodes")
+                nodes = _first_value(value, _RICH_NODE_KEYS)
                 if isinstance(nodes, list):
-                    return "".join(
-                        node.get("text") or "" for node in nodes if isinstance(node, dict)
-                    )
+                    return _node_text(nodes)
             elif isinstance(value, list):
-                return "".join(
-                    node.get("text") or "" for node in value if isinstance(node, dict)
-                )
+                return _node_text(value)
             elif isinstance(value, str):
                 return value
-        nodes = module.get("rich_text_nodes") or module.get("nodes")
+        nodes = _first_value(module, _RICH_NODE_KEYS)
         if isinstance(nodes, list):
-            return "".join(
-                node.get("text") or "" for node in nodes if isinstance(node, dict)
-            )
+            return _node_text(nodes)
         return ""
 
     def _rich_text_nodes_to_html(self, nodes: list) -> str:
@@ -2125,16 +2202,18 @@ class BiliMonitor:
 
     @staticmethod
     def _stringify(value) -> str:
+        # 绝大多数入参本来就是 str；type() is 比较不走 MRO，放在最前面。
+        t = type(value)
+        if t is str:
+            return value
         if value is None:
             return ""
-        if isinstance(value, str):
-            return value
-        if isinstance(value, dict):
+        if t is dict:
             for key in ("text", "desc", "summary", "title", "name"):
                 val = value.get(key)
                 if isinstance(val, str) and val:
                     return val
-            nodes = value.get("rich_text_nodes") or value.get("nodes")
+            nodes = _first_value(value, _RICH_NODE_KEYS)
             if isinstance(nodes, list):
                 parts = []
                 for node in nodes:
@@ -2144,7 +2223,7 @@ class BiliMonitor:
                         parts.append(str(node))
                 return "".join(parts)
             return str(value)
-        if isinstance(value, list):
+        if t is list:
             parts = []
             for item in value:
                 if isinstance(item, dict):
@@ -2158,18 +2237,19 @@ class BiliMonitor:
     def _extract_desc_text(dynamic: dict) -> str:
         text = ""
         desc = dynamic.get("desc")
-        if isinstance(desc, dict):
+        # str 形态最常见，先行短路；type() is 判断同 _stringify。
+        t = type(desc)
+        if t is str:
+            text = desc
+        elif t is dict:
             text = desc.get("text") or ""
             if not text:
                 nodes = desc.get("rich_text_nodes") or []
                 if nodes:
-                    text = "".join(
-                        node.get("text") or "" for node in nodes if isinstance(node, dict)
-                    )
-        elif isinstance(desc, str):
-            text = desc
-        elif isinstance(desc, list):
-            text = "".join(str(x) for x in desc)
+                    text = _node_text(nodes)
+        elif t is list:
+            for x in desc:
+                text += str(x)
         if not text:
             opus = (dynamic.get("major") or {}).get("opus")
             if isinstance(opus, dict):
@@ -2179,9 +2259,9 @@ class BiliMonitor:
                 elif isinstance(summary, str):
                     text = summary
                 elif isinstance(summary, list):
-                    text = "".join(node.get("text") or "" for node in summary if isinstance(node, dict))
+                    text = _node_text(summary)
                 if not text:
-                    content = opus.get("content") or opus.get("text") or ""
+                    content = _first_value(opus, _OPUS_TEXT_KEYS)
                     if content:
                         text = str(content)
         return text
@@ -9,7 +9,7 @@ def get_screenshot_templates(binding_id: int) -> BiliScreenshotTemplate:
             template_dynamic=DEFAULT_HTML_TEMPLATES.get("dynamic", ""),
             template_live=DEFAULT_HTML_TEMPLATES.get("live", ""),
         )
-    template = BiliScreenshotTemplate.query.get(binding_id)
+    template = db.session.get(BiliScreenshotTemplate, binding_id)
     if template:
         return template
     template = BiliScreenshotTemplate(
@@ -34,10 +34,17 @@ def get_screenshot_template_value(binding_id: int, key: str) -> str:
     return DEFAULT_HTML_TEMPLATES.get(key, "")
 
 
+def get_screenshot_template_pair(binding_id: int) -> tuple[str, str]:
+    template = get_screenshot_templates(binding_id)
+    dynamic = template.template_dynamic or DEFAULT_HTML_TEMPLATES.get("dynamic", "")
+    live = template.template_live or DEFAULT_HTML_TEMPLATES.get("live", "")
+    return dynamic, live
+
+
 def save_screenshot_templates(binding_id: int, template_dynamic: str, template_live: str):
     if not binding_id:
         return
-    template = BiliScreenshotTemplate.query.get(binding_id)
+    template = db.session.get(BiliScreenshotTemplate, binding_id)
     if not template:
         template = BiliScreenshotTemplate(binding_id=binding_id)
         db.session.add(template)
@@ -49,16 +56,26 @@ def save_screenshot_templates(binding_id: int, template_dynamic: str, template_l
 def delete_screenshot_templates(binding_id: int):
     if not binding_id:
         return
-    template = BiliScreenshotTemplate.query.get(binding_id)
+    template = db.session.get(BiliScreenshotTemplate, binding_id)
     if template:
         db.session.delete(template)
         db.session.commit()
 
 
+def delete_screenshot_templates_bulk(binding_ids: list[int]):
+    binding_ids = [binding_id for binding_id in binding_ids if binding_id]
+    if not binding_ids:
+        return
+    BiliScreenshotTemplate.query.filter(
+        BiliScreenshotTemplate.binding_id.in_(binding_ids)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
 def ensure_screenshot_templates(binding_id: int, template_dynamic: str, template_live: str):
     if not binding_id:
         return
-    template = BiliScreenshotTemplate.query.get(binding_id)
+    template = db.session.get(BiliScreenshotTemplate, binding_id)
     if template:
         return
     template = BiliScreenshotTemplate(
@@ -1,4 +1,5 @@
 import html as html_lib
+import re
 
 DEFAULT_HTML_TEMPLATES = {
     "dynamic": """
@@ -261,14 +262,33 @@ HTML_TEMPLATE_VARS = [
 ]
 
 
-def render_html_template(template: str, values: dict) -> str:
+_PLACEHOLDER_RE = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# 这两个键的值本身就是 HTML 片段，替换时不转义
+_RAW_HTML_KEYS = ("media_html", "text_html")
+
+# 历史模板里的遗留占位符，固定替换
+_LEGACY_VALUES = {"avatar_badge": "", "avatar_badge_display": "none"}
+
+
+def render_html_template(template: str, values: dict, _resub=_PLACEHOLDER_RE.sub) -> str:
+    # 逐键 str.replace 每次都整页扫描加分配；单次正则扫描替换全部占位符，
+    # 未知占位符保持原样。
     html = template or ""
-    for key, value in values.items():
-        if key in ("media_html", "text_html"):
-            safe = "" if value is None else str(value)
-        else:
-            safe = html_lib.escape("" if value is None else str(value))
-        html = html.replace(f"{{{key}}}", safe)
-    html = html.replace("{avatar_badge}", "")
-    html = html.replace("{avatar_badge_display}", "none")
-    return html
+    if "{" not in html:
+        return html
+
+    def _sub(match):
+        key = match.group(1)
+        if key in values:
+            value = values[key]
+            if value is None:
+                return ""
+            if key in _RAW_HTML_KEYS:
+                return str(value)
+            return html_lib.escape(str(value))
+        if key in _LEGACY_VALUES:
+            return _LEGACY_VALUES[key]
+        return match.group(0)
+
+    return _resub(_sub, html)
@@ -18,7 +18,7 @@ def _default_live_minutes() -> int:
 
 def get_global_poll_interval() -> int:
     try:
-        setting = AppSetting.query.get(_GLOBAL_POLL_KEY)
+        setting = db.session.get(AppSetting, _GLOBAL_POLL_KEY)
     except Exception:
         setting = None
     if not setting or setting.value is None:
@@ -39,7 +39,7 @@ def set_global_poll_interval(value: int) -> int:
         value = int(POLL_INTERVAL)
     if value <= 0:
         value = int(POLL_INTERVAL)
-    setting = AppSetting.query.get(_GLOBAL_POLL_KEY)
+    setting = db.session.get(AppSetting, _GLOBAL_POLL_KEY)
     if setting:
         setting.value = str(value)
     else:
@@ -50,7 +50,7 @@ def set_global_poll_interval(value: int) -> int:
 
 
 def ensure_global_poll_interval():
-    setting = AppSetting.query.get(_GLOBAL_POLL_KEY)
+    setting = db.session.get(AppSetting, _GLOBAL_POLL_KEY)
     if setting:
         return
     setting = AppSetting(key=_GLOBAL_POLL_KEY, value=str(int(POLL_INTERVAL)))
@@ -61,7 +61,7 @@ def ensure_global_poll_interval():
 def get_live_hourly_interval_minutes() -> int:
     default_minutes = _default_live_minutes()
     try:
-        setting = AppSetting.query.get(_LIVE_HOURLY_MIN_KEY)
+        setting = db.session.get(AppSetting, _LIVE_HOURLY_MIN_KEY)
     except Exception:
         setting = None
     if not setting or setting.value is None:
@@ -88,7 +88,7 @@ def set_live_hourly_interval_minutes(value: int) -> int:
     if value <= 0:
         value = default_minutes
     value = max(30, value)
-    setting = AppSetting.query.get(_LIVE_HOURLY_MIN_KEY)
+    setting = db.session.get(AppSetting, _LIVE_HOURLY_MIN_KEY)
     if setting:
         setting.value = str(value)
     else:
@@ -99,7 +99,7 @@ def set_live_hourly_interval_minutes(value: int) -> int:
 
 
 def ensure_live_hourly_interval():
-    setting = AppSetting.query.get(_LIVE_HOURLY_MIN_KEY)
+    setting = db.session.get(AppSetting, _LIVE_HOURLY_MIN_KEY)
     if setting:
         return
     setting = AppSetting(key=_LIVE_HOURLY_MIN_KEY, value=str(_default_live_minutes()))
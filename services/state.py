@@ -3,6 +3,7 @@ import logging
 from datetime import datetime
 
 from flask import has_app_context
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from models import BiliRuntimeStatus, db
 
@@ -27,13 +28,30 @@ def update_status(server_id, status):
         if not has_app_context() and _APP is not None:
             with _APP.app_context():
                 return update_status(server_id, status)
-        entry = BiliRuntimeStatus.query.get(int(server_id))
-        if entry:
-            entry.payload = payload
-            entry.updated_at = datetime.utcnow()
+        bind = db.session.get_bind(BiliRuntimeStatus)
+        if bind.dialect.name == "sqlite":
+            # 原生 upsert 一条语句搞定，省掉 SELECT-再-UPDATE 的来回。
+            stmt = sqlite_insert(BiliRuntimeStatus).values(
+                user_id=int(server_id),
+                payload=payload,
+                updated_at=datetime.utcnow(),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[BiliRuntimeStatus.user_id],
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            db.session.execute(stmt)
         else:
-            entry = BiliRuntimeStatus(user_id=int(server_id), payload=payload)
-            db.session.add(entry)
+            entry = db.session.get(BiliRuntimeStatus, int(server_id))
+            if entry:
+                entry.payload = payload
+                entry.updated_at = datetime.utcnow()
+            else:
+                entry = BiliRuntimeStatus(user_id=int(server_id), payload=payload)
+                db.session.add(entry)
         db.session.commit()
     except Exception as exc:
         _LOGGER.warning("Status update failed id=%s err=%s", server_id, exc)
@@ -46,7 +64,7 @@ def get_status(server_id):
         if not has_app_context() and _APP is not None:
             with _APP.app_context():
                 return get_status(server_id)
-        entry = BiliRuntimeStatus.query.get(int(server_id))
+        entry = db.session.get(BiliRuntimeStatus, int(server_id))
         if not entry or not entry.payload:
             return None
         return json.loads(entry.payload)
@@ -54,6 +72,28 @@ def get_status(server_id):
         return None
 
 
+def get_statuses(server_ids):
+    results = {}
+    ids = [int(server_id) for server_id in server_ids if server_id is not None]
+    if not ids:
+        return results
+    try:
+        if not has_app_context() and _APP is not None:
+            with _APP.app_context():
+                return get_statuses(ids)
+        entries = BiliRuntimeStatus.query.filter(BiliRuntimeStatus.user_id.in_(ids)).all()
+        for entry in entries:
+            if not entry.payload:
+                continue
+            try:
+                results[entry.user_id] = json.loads(entry.payload)
+            except Exception:
+                continue
+    except Exception:
+        return {}
+    return results
+
+
 def all_status():
     results = {}
     try:
@@ -79,7 +119,7 @@ def delete_status(server_id):
         if not has_app_context() and _APP is not None:
             with _APP.app_context():
                 return delete_status(server_id)
-        entry = BiliRuntimeStatus.query.get(int(server_id))
+        entry = db.session.get(BiliRuntimeStatus, int(server_id))
         if entry:
             db.session.delete(entry)
             db.session.commit()